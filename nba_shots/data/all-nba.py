@@ -1,7 +1,8 @@
-import re
-from bs4 import BeautifulSoup
 import pandas as pd
 import requests
+from metrics import RunMetrics, instrumented_get, set_run
+from player_resolver import attach_player_ids, load_resolver
+from table_extractor import extract_table
 
 
 urls = [
@@ -15,38 +16,26 @@ players = []
 seasons = []
 
 
-def get_allnba_data(page, award):
-    # Find all rows in the table
-    soup = BeautifulSoup(page.content, 'html.parser')
-    rows = soup.find_all('tr')
-    players = []
-    all_nba = []
-    
-    #print(rows)
-    for row in rows:
-        #print(r)
-        season = row.find('th', {"data-stat":"season"})
-        if season is None:
-            continue
-        season = season.text.strip()
-        #print(season.text)
-        #print(r.find('td', {"data-stat":1}))
-        for i in range(1,6):
-            player = row.find('td', {"data-stat": i})
-            if player is not None:
-                name = player.text.strip()
-                player_name = re.sub(r'\s[C|F|G]$', '', name)
-                #print(player.text)
-                if player_name:  # Only add if player name exists
-                    all_nba.append({
-                        'Season': season,
-                        'Player': player_name,
-                        'Team': None,
-                        'Award': award
-                    })
-    
-        df = pd.DataFrame(all_nba)
+def get_allnba_data(page, award, resolver=None):
+    # One pass over every table row: season plus the five team slots
+    slots = [str(i) for i in range(1,6)]
+    table = extract_table(page.content, {'season': 'Season', **{i: i for i in slots}},
+                          required=['season'], body_only=False)
+
+    # Row by row, slot by slot; empty slots drop out
+    names = table.set_index('Season')[slots].stack()
+    names = names.str.replace(r'\s[C|F|G]$', '', regex=True)
+    names = names[names != '']
+
+    df = pd.DataFrame({
+        'Season': names.index.get_level_values('Season'),
+        'Player': names.to_numpy(),
+        'Team': None,
+        'Award': award
+    })
        
+    if resolver is not None:
+        attach_player_ids(df, resolver, 'Player', 'Season')
         
     return df
         
@@ -54,11 +43,17 @@ def get_allnba_data(page, award):
 
 def main():
     awards = []
+    resolver = load_resolver()
+    run = set_run(RunMetrics('all_nba'))
     #all-nba
-    for url, award in urls:
-        page = requests.get(url)
-        df = get_allnba_data(page, award)
-        awards.append(df)
+    with run.stage('all_nba'):
+        for url, award in urls:
+            page = instrumented_get(requests.get, url, 'all_nba')
+            with run.parsing('all_nba') as timer:
+                df = get_allnba_data(page, award, resolver)
+                timer.rows = len(df)
+            awards.append(df)
+    run.save()
     
     final_all_nba_df = pd.concat(awards, ignore_index=True) 
     final_all_nba_csv = final_all_nba_df.to_csv('all_nba_final.csv')
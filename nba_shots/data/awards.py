@@ -1,69 +1,50 @@
 import requests
-from bs4 import BeautifulSoup
 import pandas as pd
+from metrics import RunMetrics, get_run, instrumented_get, set_run
+from player_resolver import attach_player_ids, load_resolver
+from table_extractor import extract_table, first_text
 
-def get_player_awards(url):
+AWARD_TITLES = {
+    'NBA & ABA Rookie of the Year (Wilt Chamberlain Trophy) Award Winners': 'ROY',
+    'NBA MVP & ABA Most Valuable Player Award Winners': 'MVP',
+    'NBA Defensive Player of the Year (Hakeem Olajuwon Trophy) Award Winners': 'DPOY',
+    'NBA Finals Most Valuable Player (Bill Russell Trophy) Award Winners': 'FMVP',
+}
+
+
+def parse_player_awards(content, resolver=None):
+    """Parses an award winners page into Season, Player, Team and Award columns."""
+    award = AWARD_TITLES.get(first_text(content, 'h1'))
+    print(award)
+
+    # Winners are in the first table; one pass maps its cells into columns
+    awards_df = extract_table(content, {'season': 'Season', 'player': 'Player', 'team_id': 'Team'},
+                              required=['season', 'player'], max_tables=1)
+    if awards_df.empty:
+        raise ValueError("Could not find table body in the page")
+    awards_df['Award'] = award
+
+    if resolver is not None:
+        attach_player_ids(awards_df, resolver, 'Player', 'Season')
+
+    return awards_df
+
+
+def get_player_awards(url, resolver=None):
     """
     Scrapes NBA Defensive Player of the Year award data from Basketball Reference.
     Returns a pandas DataFrame with season, player, and team information.
+    With a PlayerResolver, a bball_id column is added from player and season.
     """
     
     
     try:
         # Fetch the page
-        response = requests.get(url)
+        response = instrumented_get(requests.get, url, 'awards')
         response.raise_for_status()  # Raise an exception for bad status codes
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Find the main table body
-        tbody = soup.find('tbody')
-        if not tbody:
-            raise ValueError("Could not find table body in the page")
-        
-        # Initialize lists to store data
-        seasons = []
-        players = []
-        teams = []
-        h1 = soup.find('h1')
-    
-        if h1.text == 'NBA & ABA Rookie of the Year (Wilt Chamberlain Trophy) Award Winners':
-            award = 'ROY'
-        elif h1.text == 'NBA MVP & ABA Most Valuable Player Award Winners':
-            award = 'MVP'
-        elif h1.text == 'NBA Defensive Player of the Year (Hakeem Olajuwon Trophy) Award Winners':
-            award = 'DPOY'
-        elif h1.text == 'NBA Finals Most Valuable Player (Bill Russell Trophy) Award Winners':
-            award = 'FMVP'
-        else:
-            award = None
-        print(award)
-    
-        # Extract rows
-        for row in tbody.find_all('tr'):
-            
-            # Get season
-            season = row.find('th', {'data-stat': 'season'})
-            if season:
-                seasons.append(season.text)
-            
-            # Get player
-            player = row.find('td', {'data-stat': 'player'})
-            if player:
-                players.append(player.text)
-            
-            # Get team
-            team = row.find('td', {'data-stat': 'team_id'})
-            if team:
-                teams.append(team.text)
-        
-        # Create DataFrame
-        awards_df = pd.DataFrame({
-            'Season': seasons,
-            'Player': players,
-            'Team': teams, 
-            'Award': award
-        })
-        
+        with get_run().parsing('awards') as timer:
+            awards_df = parse_player_awards(response.content, resolver)
+            timer.rows = len(awards_df)
         return awards_df
     
     except requests.exceptions.RequestException as e:
@@ -82,10 +63,14 @@ def main():
     finals_mvp = 'https://www.basketball-reference.com/awards/finals_mvp.html'
 
 
-    dpoy_df = get_player_awards(dpoy_url)
-    roy_df = get_player_awards(roy_url)
-    mvp_df = get_player_awards(mvp_url)
-    finalsmvp_df = get_player_awards(finals_mvp)
+    resolver = load_resolver()
+    run = set_run(RunMetrics('awards'))
+    with run.stage('awards'):
+        dpoy_df = get_player_awards(dpoy_url, resolver)
+        roy_df = get_player_awards(roy_url, resolver)
+        mvp_df = get_player_awards(mvp_url, resolver)
+        finalsmvp_df = get_player_awards(finals_mvp, resolver)
+    run.save()
     #concat all awards into one df 
     player_awards_df = pd.concat([dpoy_df, roy_df, mvp_df,finalsmvp_df], ignore_index=True)
 
@@ -1,16 +1,196 @@
+import argparse
+import csv
+import os
 import re
+import threading
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
+import lxml.html
 import random
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 import logging
 import datetime
+from metrics import RunMetrics, get_run, instrumented_get, set_run
+from player_registry import load_registry
+
+
+HTML_PARSER = lxml.html.HTMLParser(encoding='utf-8')
+STAGE = 'player_pages'  # metrics stage for player page requests
+
+
+def count_championships(championship_texts):
+    """Sums the 'Nx NBA Champ' counts; a bare year (single title) counts as 1."""
+    if not championship_texts:
+        return 0
+
+    total_championships = sum(
+        int(match.group()) 
+        for text in championship_texts 
+        if (match := re.search(r'\d+', text))
+    )
+    
+    return 1 if len(str(total_championships)) == 4 else total_championships
+
+
+def extract_player_page(content):
+    """Pulls name, team, pullout stats and championships from a player page in one tree walk.
+
+    Returns (player_name, team, stats, championships) where stats maps each
+    pullout stat to its (current season, career) values.
+    """
+    root = lxml.html.document_fromstring(content, parser=HTML_PARSER)
+    player_name = None
+    team = None
+    stats = None
+    championship_texts = None
+
+    # Depth-first walk in document order; matched elements are consumed
+    # without descending further.
+    stack = [root]
+    while stack:
+        element = stack.pop()
+        tag = element.tag
+        if not isinstance(tag, str):
+            continue
+
+        if tag == 'h1':
+            if player_name is None:
+                player_name = element.text_content().strip()
+            continue
+
+        if tag == 'p':
+            if team is None:
+                strong_tag = next(element.iter('strong'), None)
+                if strong_tag is not None and strong_tag.text_content() == 'Team':
+                    team_link = next(element.iter('a'), None)
+                    if team_link is not None:
+                        team = team_link.text_content()
+            continue
+
+        if tag == 'ul' and element.get('id') == 'bling':
+            if championship_texts is None:
+                championship_texts = [
+                    text for text in (li.text_content() for li in element.iter('li'))
+                    if 'NBA Champ' in text
+                ]
+            continue
+
+        if tag == 'div' and stats is None and 'stats_pullout' in element.get('class', '').split():
+            stats = {}
+            for section in element.iter('div'):
+                if not any(c.startswith('p') for c in section.get('class', '').split()):
+                    continue
+                for stat_div in section:
+                    if stat_div.tag != 'div':
+                        continue
+                    poptip = next((span for span in stat_div.iter('span')
+                                   if 'poptip' in span.get('class', '').split()), None)
+                    if poptip is None:
+                        continue
+                    stat_name = next(poptip.iter('strong')).text_content()
+                    values = [value.text_content() for value in stat_div.iter('p')]
+                    if len(values) >= 2:
+                        stats[stat_name] = (values[0], values[1])
+            continue
+
+        stack.extend(reversed(element))
+
+    return player_name, team or "Unknown", stats, count_championships(championship_texts)
+
+
+class RateLimiter:
+    """A request budget shared by all worker threads: at most `rate` requests per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self.lock = threading.Lock()
+        self.next_slot = 0.0
+
+    def wait(self):
+        """Blocks until this caller's slot; returns the seconds slept."""
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+        return max(slot - now, 0.0)
+
+
+class CsvSink:
+    """Appends each player's rows to the output CSVs as soon as they are scraped.
+
+    Finished player ids go to a journal after their rows are flushed, so a rerun
+    can skip them. A crash mid-player can at worst repeat that one player's rows.
+    Without journal entries there is nothing to resume, so the CSVs are started
+    over rather than appended to.
+    """
+
+    STATS_COLUMNS = ['Player', 'Player_id', 'G', 'PTS', 'TRB', 'AST', 'FG%', 'FG3%', 'FT%', 'eFG%', 'PER', 'WS']
+    CHAMPIONSHIP_COLUMNS = ['Season', 'Player', 'Tm', 'Award', 'Player_id']
+
+    def __init__(self, directory: str = '.', journal: str = 'scraped_players.txt'):
+        self.directory = directory
+        self.journal_path = os.path.join(directory, journal)
+        self.done = set()
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                self.done = {line.strip() for line in f if line.strip()}
+        self.resuming = bool(self.done)
+
+        self.handles = []
+        self.championships = self.open_writer('championships.csv', self.CHAMPIONSHIP_COLUMNS)
+        self.career_stats = self.open_writer('career_stats.csv', self.STATS_COLUMNS)
+        self.season_stats = self.open_writer('season_stats.csv', self.STATS_COLUMNS)
+        # player_team.csv keeps the unnamed index column pandas used to write
+        self.team_index = self.count_rows('player_team.csv') if self.resuming else 0
+        self.player_team = self.open_writer('player_team.csv', ['', 'Player', 'Team', 'Player_id'])
+        self.journal = open(self.journal_path, 'a', encoding='utf-8')
+
+    def open_writer(self, filename: str, columns: List[str]):
+        path = os.path.join(self.directory, filename)
+        is_new = not self.resuming or not os.path.exists(path) or os.path.getsize(path) == 0
+        handle = open(path, 'a' if self.resuming else 'w', newline='', encoding='utf-8')
+        self.handles.append(handle)
+        writer = csv.DictWriter(handle, fieldnames=columns, extrasaction='ignore')
+        if is_new:
+            writer.writeheader()
+        return writer
+
+    def count_rows(self, filename: str):
+        path = os.path.join(self.directory, filename)
+        if not os.path.exists(path):
+            return 0
+        with open(path, 'r', encoding='utf-8') as f:
+            return max(sum(1 for _ in f) - 1, 0)
+
+    def write(self, player_id: str, result):
+        self.player_team.writerow({'': self.team_index, **result['team']})
+        self.team_index += 1
+        self.career_stats.writerow(result['career_stats'])
+        if result['season_stats'] is not None:
+            self.season_stats.writerow(result['season_stats'])
+        self.championships.writerows(result['championships'].to_dict('records'))
+
+        for handle in self.handles:
+            handle.flush()
+        self.journal.write(player_id + '\n')
+        self.journal.flush()
+        self.done.add(player_id)
+
+    def close(self):
+        for handle in self.handles:
+            handle.close()
+        self.journal.close()
 
 
 class BasketballReferenceScraper:
-    def __init__(self):
+    def __init__(self, workers: int = 1, requests_per_second: float = 0.5, single_pass: bool = True):
         self.user_agents = [
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.159 Safari/537.36",
@@ -20,8 +200,20 @@ class BasketballReferenceScraper:
         self.all_career_stats = []
         self.current_season_stats = []
         self.player_team = []
+        self.workers = workers
+        self.single_pass = single_pass
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self.session = self.create_session()
         self.setup_logging()
 
+    def create_session(self):
+        """A keep-alive session whose connection pool fits every worker."""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(self.workers, 1))
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
     def setup_logging(self):
         logging.basicConfig(
             level=logging.INFO,
@@ -37,9 +229,10 @@ class BasketballReferenceScraper:
 
     def make_request(self, url: str):
         try:
-            response = requests.get(url, headers=self.get_headers())
+            # Respectful delay, shared across workers
+            get_run().record_sleep(STAGE, self.rate_limiter.wait())
+            response = instrumented_get(self.session.get, url, STAGE, headers=self.get_headers())
             response.raise_for_status()
-            time.sleep(2)  # Respectful delay between requests
             return response
         except requests.exceptions.RequestException as e:
             logging.error(f"Error fetching {url}: {str(e)}")
@@ -55,16 +248,7 @@ class BasketballReferenceScraper:
             if 'NBA Champ' in li.text
         ]
         
-        if not championship_texts:
-            return 0
-
-        total_championships = sum(
-            int(match.group()) 
-            for text in championship_texts 
-            if (match := re.search(r'\d+', text))
-        )
-        
-        return 1 if len(str(total_championships)) == 4 else total_championships
+        return count_championships(championship_texts)
 
     def parse_team(self, soup: BeautifulSoup):
         """Extracts the player's team from the page."""
@@ -109,14 +293,23 @@ class BasketballReferenceScraper:
             'Player_id': player_id
         })
 
-    def scrape_player(self, player_id: str, last_year):
+    def fetch_player(self, player_id: str, last_year):
+        """Fetches and parses one player page without touching the shared result lists."""
         url = self.get_player_url(player_id)
         response = self.make_request(url)
         
         if not response:
             return None
 
-        soup = BeautifulSoup(response.content, 'html.parser')
+        parse = self.extract_player if self.single_pass else self.parse_player
+        with get_run().parsing(STAGE) as timer:
+            result = parse(response.content, player_id, last_year)
+            timer.rows = 0 if result is None else 1
+        return result
+
+    def parse_player(self, content, player_id: str, last_year):
+        """Parses a player page with BeautifulSoup, one search per field."""
+        soup = BeautifulSoup(content, 'html.parser')
         player_name = soup.find("h1")
         
         if not player_name:
@@ -128,39 +321,103 @@ class BasketballReferenceScraper:
 
         # Get team
         team = self.parse_team(soup)  # Call parse_team function
-        self.player_team.append({'Player': player_name, 'Team':team})
-        #print(self.player_team)
 
         # Get career stats
         career_stats = self.parse_career_stats(soup, player_name, player_id)
-        #career_stats['Team'] = team  # Add team info to career stats
-        self.all_career_stats.append(career_stats)
 
         # Get current season stats if player is active
+        season_stats = None
         current_year = datetime.date.today().year
         if last_year == current_year:
             season_stats = self.parse_season_stats(soup, player_name, player_id)
-            self.current_season_stats.append(season_stats)
             logging.info(f"Retrieved current season stats for {player_name}")
 
         # Get championships
         num_champs = self.parse_championships(soup)
         championship_rows = self.create_championships_df(player_name, num_champs, player_id)
 
-        return championship_rows
+        return {
+            'team': {'Player': player_name, 'Team': team, 'Player_id': player_id},
+            'career_stats': career_stats,
+            'season_stats': season_stats,
+            'championships': championship_rows,
+        }
+
+    def extract_player(self, content, player_id: str, last_year):
+        """Same result as parse_player, from a single lxml tree walk."""
+        player_name, team, stats, num_champs = extract_player_page(content)
+
+        if not player_name:
+            logging.error(f"Could not find player name for {player_id}")
+            return None
+
+        print(f"Scraping: {player_name}")
+
+        career_stats = {'Player': player_name, 'Player_id': player_id}
+        for stat_name, (_, career) in (stats or {}).items():
+            career_stats[stat_name] = career
+
+        season_stats = None
+        current_year = datetime.date.today().year
+        if last_year == current_year and stats is not None:
+            season_stats = {'Player': player_name, 'Player_id': player_id}
+            for stat_name, (season, _) in stats.items():
+                season_stats[stat_name] = season
+            logging.info(f"Retrieved current season stats for {player_name}")
+
+        return {
+            'team': {'Player': player_name, 'Team': team, 'Player_id': player_id},
+            'career_stats': career_stats,
+            'season_stats': season_stats,
+            'championships': self.create_championships_df(player_name, num_champs, player_id),
+        }
+
+    def collect(self, result):
+        """Appends one fetched player's rows to the shared result lists."""
+        self.player_team.append(result['team'])
+        self.all_career_stats.append(result['career_stats'])
+        if result['season_stats'] is not None:
+            self.current_season_stats.append(result['season_stats'])
+
+    def scrape_player(self, player_id: str, last_year):
+        result = self.fetch_player(player_id, last_year)
+
+        if result is None:
+            return None
+
+        self.collect(result)
+        return result['championships']
+
+    def safe_fetch_player(self, player_id: str, last_year):
+        try:
+            logging.info(f"Scraping data for player: {player_id}")
+            return self.fetch_player(player_id, last_year)
+        except Exception as e:
+            logging.error(f"Error scraping player {player_id}: {str(e)}")
+            return None
 
     def scrape_players(self, player_ids: List[str], player_last_years):
         all_championships = []
         
-        for player_id, last_year in zip(player_ids, player_last_years):
-            try:
-                logging.info(f"Scraping data for player: {player_id}")
-                championship_data = self.scrape_player(player_id, last_year)
-                if championship_data is not None:
-                    all_championships.append(championship_data)
-            except Exception as e:
-                logging.error(f"Error scraping player {player_id}: {str(e)}")
-                continue
+        if self.workers > 1:
+            # Pages are fetched concurrently but collected in input order,
+            # so the CSV outputs match a sequential run
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                results = executor.map(self.safe_fetch_player, player_ids, player_last_years)
+                for result in results:
+                    if result is not None:
+                        self.collect(result)
+                        all_championships.append(result['championships'])
+        else:
+            for player_id, last_year in zip(player_ids, player_last_years):
+                try:
+                    logging.info(f"Scraping data for player: {player_id}")
+                    championship_data = self.scrape_player(player_id, last_year)
+                    if championship_data is not None:
+                        all_championships.append(championship_data)
+                except Exception as e:
+                    logging.error(f"Error scraping player {player_id}: {str(e)}")
+                    continue
     
         if not all_championships:
             logging.warning("No championship data was collected")
@@ -182,6 +439,37 @@ class BasketballReferenceScraper:
             logging.error(f"Error processing or saving data: {str(e)}")
             return None
 
+    def stream_players(self, player_ids: List[str], player_last_years, sink: CsvSink):
+        """Scrapes players not yet in the sink's journal, writing each one as it completes.
+
+        Only a small window of pages is in flight at once, so memory stays flat
+        regardless of how many players are scraped.
+        """
+        todo = [(player_id, last_year) for player_id, last_year in zip(player_ids, player_last_years)
+                if player_id not in sink.done]
+        logging.info(f"Resuming with {len(todo)} of {len(player_ids)} players left")
+
+        written = 0
+        window = max(self.workers, 1) * 4
+        with ThreadPoolExecutor(max_workers=max(self.workers, 1)) as executor:
+            pending = deque()
+            for player_id, last_year in todo:
+                pending.append((player_id, executor.submit(self.safe_fetch_player, player_id, last_year)))
+                if len(pending) >= window:
+                    written += self.drain(pending.popleft(), sink)
+            while pending:
+                written += self.drain(pending.popleft(), sink)
+
+        return written
+
+    def drain(self, task, sink: CsvSink):
+        player_id, future = task
+        result = future.result()
+        if result is None:
+            return 0
+        sink.write(player_id, result)
+        return 1
+
     def parse_season_stats(self, soup: BeautifulSoup, player_name: str, player_id: str):
         season_stats = {'Player': player_name, 'Player_id': player_id}
         stats_container = soup.find("div", class_="stats_pullout")
@@ -199,15 +487,35 @@ class BasketballReferenceScraper:
         return season_stats
 
 
-def main():
-    # Read player IDs from CSV
-    players_df = pd.read_csv('Player.csv')
-    player_ids = players_df['bball_id'].tolist()
-    player_last_years = players_df['To']
+def main(workers=1, requests_per_second=0.5, stream=False):
+    run = set_run(RunMetrics('bball_scraper'))
+    try:
+        with run.stage(STAGE):
+            return scrape(workers, requests_per_second, stream)
+    finally:
+        run.save()
+
+
+def scrape(workers=1, requests_per_second=0.5, stream=False):
+    # Player IDs and last seasons from the shared registry
+    registry = load_registry('Player.csv')
+    player_ids = registry.ids
+    player_last_years = registry.last_years()
     
 
     # Initialize and run scraper
-    scraper = BasketballReferenceScraper()
+    scraper = BasketballReferenceScraper(workers, requests_per_second)
+
+    if stream:
+        # Rows are appended as players finish; rerunning resumes from the journal
+        sink = CsvSink()
+        try:
+            written = scraper.stream_players(player_ids, player_last_years, sink)
+        finally:
+            sink.close()
+        logging.info(f"Scraping completed successfully, {written} players written")
+        return written
+
     championship_data = scraper.scrape_players(player_ids,player_last_years)
     
     
@@ -224,4 +532,10 @@ def main():
     return championship_data
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scrape Basketball-Reference player pages.")
+    parser.add_argument("--workers", type=int, default=1, help="player pages fetched concurrently")
+    parser.add_argument("--rate", type=float, default=0.5, help="requests per second shared by all workers")
+    parser.add_argument("--stream", action="store_true",
+                        help="append rows as players finish and resume from scraped_players.txt")
+    args = parser.parse_args()
+    main(args.workers, args.rate, args.stream)
\ No newline at end of file
@@ -0,0 +1,276 @@
+import argparse
+import contextlib
+import functools
+import gc
+import hashlib
+import importlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+import pandas as pd
+from bs4 import BeautifulSoup
+from awards import parse_player_awards
+from bball_scraper import BasketballReferenceScraper, extract_player_page
+from player import parse_bio_page, parse_draft_page
+from shot_parser import parse_shots_html, parse_shots_soup
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = os.path.join(HERE, "bench_fixtures")
+# Committed: rows and output digest per parser, the same on every machine
+BASELINE_FILE = os.path.join(HERE, "bench_baseline.json")
+# Not committed: this machine's pages/s and peak RSS, which only compare against the same machine
+LOCAL_BASELINE_FILE = os.path.join(HERE, "bench_local.json")
+TOLERANCE = 0.25  # allowed slowdown / memory growth before a run counts as a regression
+MIN_SECONDS = 1.0  # each parser is repeated until at least this long has been measured
+ROUNDS = 5  # MIN_SECONDS is split into rounds and the fastest counts, so a cold start is not a regression
+
+all_nba = importlib.import_module("all-nba")
+
+
+@functools.cache
+def scraper():
+    """Built on first use, since the scraper's constructor sets up its log file."""
+    return BasketballReferenceScraper()
+
+
+def soup(content):
+    return BeautifulSoup(content, "html.parser")
+
+
+# name -> (fixture, parse(content) -> parsed output, rows(output) -> rows produced)
+BENCHMARKS = {
+    "parse_shots": ("shots.html", lambda content: parse_shots_html(content.decode("utf-8")), len),
+    "parse_career_stats": ("player.html", lambda content: scraper().parse_career_stats(soup(content), "", ""),
+                           lambda output: int(bool(output))),
+    "parse_season_stats": ("player.html", lambda content: scraper().parse_season_stats(soup(content), "", ""),
+                           lambda output: int(bool(output))),
+    "extract_player_page": ("player.html", extract_player_page, lambda output: int(output[2] is not None)),
+    "get_player_awards": ("awards_mvp.html", parse_player_awards, len),
+    "get_allnba_data": ("all_league.html",
+                        lambda content: all_nba.get_allnba_data(SimpleNamespace(content=content), "All-NBA"), len),
+    "scrape_draft_data": ("draft_2003.html", lambda content: parse_draft_page(content, 2003), len),
+    "scrape_player_bio": ("players_a.html", parse_bio_page, len),
+}
+
+# name -> (fixture, fast parser, reference parser it replaced); outputs must be equal
+REFERENCES = {
+    "parse_shots": ("shots.html", lambda content: parse_shots_html(content.decode("utf-8")),
+                    lambda content: parse_shots_soup(content.decode("utf-8"))),
+}
+
+
+def read_fixture(fixture):
+    with open(os.path.join(FIXTURE_DIR, fixture), "rb") as f:
+        return f.read()
+
+
+def reference_mismatches(names=None):
+    """Parsers whose output on their fixture differs from the parser they replaced."""
+    problems = []
+    for name, (fixture, parse, reference) in REFERENCES.items():
+        if names and name not in names:
+            continue
+        content = read_fixture(fixture)
+        if parse(content) != reference(content):
+            problems.append(f"{name}: output differs from the reference parser on {fixture}")
+    return problems
+
+
+def output_digest(output):
+    """sha256 of a parser's output, so a baseline catches wrong values and not just wrong row counts."""
+    if isinstance(output, pd.DataFrame):
+        text = output.to_json(orient="split", date_format="iso")
+    else:
+        text = json.dumps(output, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def rss_kb():
+    """(current, peak) resident set size of this process in KB.
+
+    Unlike tracemalloc this includes memory allocated by C libraries such as
+    libxml2. On Linux the peak can be reset (see reset_peak_rss); elsewhere
+    only ru_maxrss is known, so a peak below an earlier high-water mark is missed.
+    """
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            fields = dict(line.split(":", 1) for line in f)
+        return int(fields["VmRSS"].split()[0]), int(fields["VmHWM"].split()[0])
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak = peak // 1024 if sys.platform == "darwin" else peak  # bytes on macOS, KB on Linux
+        return peak, peak
+
+
+def reset_peak_rss():
+    """Restarts the kernel's peak RSS mark from the current RSS (Linux only)."""
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def first_parse_rss_kb(name):
+    """How far peak RSS rises above RSS while a fresh process parses `name`'s fixture once.
+
+    Runs in its own process (see peak_rss_kb), so memory freed by earlier
+    parses cannot be reused and hide the parser's own footprint.
+    """
+    fixture, parse, _ = BENCHMARKS[name]
+    content = read_fixture(fixture)
+    gc.collect()
+    reset_peak_rss()
+    before, _ = rss_kb()
+    with contextlib.redirect_stdout(io.StringIO()):
+        parse(content)
+    _, peak = rss_kb()
+    return max(peak - before, 0)
+
+
+def peak_rss_kb(names):
+    """{name: first_parse_rss_kb(name)}, each measured in a newly spawned process."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"),
+                             max_tasks_per_child=1) as executor:
+        return dict(zip(names, executor.map(first_parse_rss_kb, names)))
+
+
+def run_benchmark(parse, count, content, min_seconds=MIN_SECONDS, rounds=ROUNDS):
+    """Returns {pages_per_sec, rows_per_sec, rows, digest} for one parser on one page.
+
+    pages_per_sec is the fastest of `rounds` rounds.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):  # several parsers print progress
+        output = parse(content)  # warm-up, also the row count and digest
+        rows = count(output)
+
+        best = 0.0
+        for _ in range(rounds):
+            pages = 0
+            start = time.perf_counter()
+            while True:
+                parse(content)
+                pages += 1
+                elapsed = time.perf_counter() - start
+                if elapsed >= min_seconds / rounds:
+                    break
+            best = max(best, pages / elapsed)
+
+    return {
+        "pages_per_sec": best,
+        "rows_per_sec": best * rows,
+        "rows": rows,
+        "digest": output_digest(output),
+    }
+
+
+def output_problems(name, result, baseline):
+    """Reasons `result` parsed something other than the committed baseline."""
+    if result["rows"] != baseline["rows"]:
+        return [f"{name}: {result['rows']} rows, baseline {baseline['rows']}"]
+    if result["digest"] != baseline["digest"]:
+        return [f"{name}: parsed output differs from the baseline"]
+    return []
+
+
+def regressions(name, result, baseline, tolerance=TOLERANCE):
+    """Reasons `result` is slower or larger than this machine's `baseline`."""
+    problems = []
+    if result["pages_per_sec"] < baseline["pages_per_sec"] * (1 - tolerance):
+        problems.append(f"{name}: {result['pages_per_sec']:.1f} pages/s, baseline {baseline['pages_per_sec']:.1f}")
+    # A few hundred KB of RSS is page-granularity noise, not a regression
+    if result["peak_rss_kb"] > baseline["peak_rss_kb"] * (1 + tolerance) + 512:
+        problems.append(f"{name}: peak RSS +{result['peak_rss_kb']:.0f} KB, "
+                        f"baseline +{baseline['peak_rss_kb']:.0f} KB")
+    return problems
+
+
+def read_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_json(value, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(value, f, indent=2)
+        f.write("\n")
+
+
+def main(names=None, baseline_file=BASELINE_FILE, save=False, tolerance=TOLERANCE, min_seconds=MIN_SECONDS,
+         local_file=LOCAL_BASELINE_FILE):
+    """Runs the parser benchmarks on the stored fixtures; returns False on a regression or wrong output.
+
+    Output (rows and digest) is checked against the committed baseline_file.
+    Speed and memory are only checked against local_file, recorded on this
+    machine with save=True, since they mean nothing on another one.
+    """
+    mismatches = reference_mismatches(names)
+    for problem in mismatches:
+        print(f"MISMATCH {problem}")
+
+    selected = [name for name in BENCHMARKS if not names or name in names]
+    peaks = peak_rss_kb(selected)
+
+    results = {}
+    print(f"{'parser':<22}{'pages/s':>10}{'rows/s':>12}{'peak RSS KB':>13}{'rows':>7}")
+    for name in selected:
+        fixture, parse, count = BENCHMARKS[name]
+        result = run_benchmark(parse, count, read_fixture(fixture), min_seconds)
+        result["peak_rss_kb"] = peaks[name]
+        results[name] = result
+        print(f"{name:<22}{result['pages_per_sec']:>10.1f}{result['rows_per_sec']:>12.0f}"
+              f"{result['peak_rss_kb']:>13.0f}{result['rows']:>7}")
+
+    host = platform.node()
+    if save:
+        baseline = read_json(baseline_file, {})
+        baseline.update({name: {"rows": r["rows"], "digest": r["digest"]} for name, r in results.items()})
+        write_json(baseline, baseline_file)
+        local = read_json(local_file, {})
+        local = local if local.get("host") == host else {"host": host, "parsers": {}}
+        local["parsers"].update({name: {"pages_per_sec": r["pages_per_sec"], "peak_rss_kb": r["peak_rss_kb"]}
+                                 for name, r in results.items()})
+        write_json(local, local_file)
+        print(f"Saved outputs to {baseline_file} and this machine's timings to {local_file}")
+        return not mismatches
+
+    if not os.path.exists(baseline_file):
+        print(f"No baseline at {baseline_file}; run with --save-baseline to record one.")
+        return not mismatches
+
+    baseline = read_json(baseline_file, {})
+    problems = [problem for name, result in results.items() if name in baseline
+                for problem in output_problems(name, result, baseline[name])]
+
+    local = read_json(local_file, {})
+    if local.get("host") == host:
+        problems += [problem for name, result in results.items() if name in local["parsers"]
+                     for problem in regressions(name, result, local["parsers"][name], tolerance)]
+    else:
+        print(f"No timings for this machine in {local_file}; run with --save-baseline to check speed and memory.")
+
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    return not problems and not mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the page parsers on stored HTML fixtures (no network).")
+    parser.add_argument("parsers", nargs="*", help=f"parsers to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="committed output baseline (rows and digests)")
+    parser.add_argument("--local-baseline", default=LOCAL_BASELINE_FILE, help="this machine's timings and memory")
+    parser.add_argument("--save-baseline", action="store_true", help="record this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="allowed fractional regression")
+    parser.add_argument("--min-seconds", type=float, default=MIN_SECONDS, help="measured time per parser")
+    args = parser.parse_args()
+    ok = main(args.parsers, args.baseline, args.save_baseline, args.tolerance, args.min_seconds, args.local_baseline)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,66 @@
+import argparse
+import contextlib
+import datetime
+import glob
+import io
+import os
+import time
+from bball_scraper import BasketballReferenceScraper
+
+
+def time_parser(parse, pages, repeat):
+    """Returns the mean seconds per page for `parse` over every saved page."""
+    with contextlib.redirect_stdout(io.StringIO()):  # parsers print "Scraping: ..."
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for player_id, content in pages:
+                parse(content, player_id, datetime.date.today().year)
+        elapsed = time.perf_counter() - start
+    return elapsed / (repeat * len(pages))
+
+
+def same_result(a, b):
+    if a is None or b is None:
+        return a is b
+    return (a['team'] == b['team'] and a['career_stats'] == b['career_stats']
+            and a['season_stats'] == b['season_stats'] and a['championships'].equals(b['championships']))
+
+
+def main(paths, repeat=20):
+    """Compares per-page parse time of the BeautifulSoup path and the single-pass extractor."""
+    pages = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            pages.append((os.path.splitext(os.path.basename(path))[0], f.read()))
+
+    if not pages:
+        print("No player pages given.")
+        return
+
+    scraper = BasketballReferenceScraper()
+    current_year = datetime.date.today().year
+    with contextlib.redirect_stdout(io.StringIO()):
+        mismatches = [
+            player_id for player_id, content in pages
+            if not same_result(scraper.parse_player(content, player_id, current_year),
+                               scraper.extract_player(content, player_id, current_year))
+        ]
+
+    soup_time = time_parser(scraper.parse_player, pages, repeat)
+    single_time = time_parser(scraper.extract_player, pages, repeat)
+
+    print(f"{len(pages)} pages x {repeat} runs")
+    print(f"BeautifulSoup (html.parser): {soup_time * 1000:8.2f} ms/page")
+    print(f"Single-pass (lxml):          {single_time * 1000:8.2f} ms/page")
+    print(f"Speedup:                     {soup_time / single_time:8.1f}x")
+    if mismatches:
+        print(f"Results differ for: {', '.join(mismatches)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark player page parsing on saved HTML.")
+    parser.add_argument("pages", nargs="*", help="saved player pages, e.g. jamesle01.html")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    paths = [path for pattern in args.pages for path in glob.glob(pattern)]
+    main(paths, args.repeat)
@@ -0,0 +1,113 @@
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+
+CHUNK_SIZE = 500  # rows per upsert request
+WORKERS = 4  # upsert requests in flight
+RETRIES = 3
+RETRY_DELAY = 1
+
+
+def frame_to_records(df, columns):
+    """Converts a frame to JSON-ready dicts column-wise instead of row by row.
+
+    `columns` maps each output key to (source column, kind) where kind is
+    "int", "float" or None (kept as is). Missing values become None.
+    """
+    out = pd.DataFrame(index=df.index)
+    for key, (source, kind) in columns.items():
+        column = df[source]
+        if kind == "int":
+            column = pd.to_numeric(column, errors="coerce").astype("Int64")
+        elif kind == "float":
+            column = pd.to_numeric(column, errors="coerce")
+        out[key] = column
+
+    out = out.astype(object)
+    return out.where(out.notna(), None).to_dict("records")
+
+
+def chunked(records, size):
+    for start in range(0, len(records), size):
+        yield records[start:start + size]
+
+
+class BulkLoadReport:
+    def __init__(self, table):
+        self.table = table
+        self.rows = 0
+        self.chunks = 0
+        self.retries = 0
+        self.failed_chunks = 0
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        text = (f"Upserted {self.rows} rows into {self.table} in {self.chunks} chunks, "
+                f"{self.seconds:.2f}s ({self.rows_per_second:.0f} rows/s)")
+        if self.retries:
+            text += f", {self.retries} retries"
+        if self.failed_chunks:
+            text += f", {self.failed_chunks} chunks failed"
+        return text
+
+
+class BulkLoadError(RuntimeError):
+    """Raised when chunks still failed after their retries; `report` says how many."""
+
+    def __init__(self, report):
+        super().__init__(f"{report.failed_chunks} of {report.chunks + report.failed_chunks} chunks "
+                         f"could not be upserted into {report.table}")
+        self.report = report
+
+
+def upsert_chunk(sink, table, rows, on_conflict, report, lock, retries=RETRIES, delay=RETRY_DELAY):
+    """Upserts one chunk, retrying with backoff; returns the rows the sink sent back."""
+    for attempt in range(retries):
+        try:
+            data = sink.upsert(table, rows, on_conflict)
+            with lock:
+                report.rows += len(rows)
+                report.chunks += 1
+            return data
+        except Exception as e:
+            print(f"Error upserting {len(rows)} rows into {table}: {e}")
+            if attempt == retries - 1:
+                with lock:
+                    report.failed_chunks += 1
+                return []
+            with lock:
+                report.retries += 1
+            time.sleep(random.uniform(delay, delay * 2))
+            delay *= 2
+
+
+def bulk_upsert(sink, table, records, on_conflict, chunk_size=CHUNK_SIZE, workers=WORKERS):
+    """Upserts records into a sink (see sinks.py) in chunks over several workers.
+
+    Returns (returned rows in input order, BulkLoadReport). Every chunk is
+    attempted; if any still failed after its retries, BulkLoadError is raised
+    instead, so a partial load never looks like a complete one.
+    """
+    report = BulkLoadReport(table)
+    lock = threading.Lock()
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(
+            lambda rows: upsert_chunk(sink, table, rows, on_conflict, report, lock),
+            chunked(records, chunk_size),
+        )
+        data = list(itertools.chain.from_iterable(results))
+
+    report.seconds = time.perf_counter() - start
+    print(report)
+    if report.failed_chunks:
+        raise BulkLoadError(report)
+    return data, report
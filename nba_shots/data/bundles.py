@@ -0,0 +1,117 @@
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from query_service import PlayerData, to_json
+
+BUNDLE_DIR = "bundles"
+INDEX_NAME = "index.json"
+MANIFEST_NAME = "manifest.json"
+BUNDLE_VERSION = "1"  # bump when the bundle layout changes, so every bundle is rebuilt
+INDEX_COLUMNS = ["player", "position", "from", "to"]
+
+# Loaded once per worker process by init_worker
+worker_data = None
+
+
+def input_hash(data, player_id):
+    """Digest of everything that goes into one player's bundle.
+
+    Shots are hashed as their raw store records, so unchanged players are
+    recognised without building their shot lists.
+    """
+    digest = hashlib.sha1(BUNDLE_VERSION.encode())
+    digest.update(to_json(data.player_detail(player_id, shots=False)).encode("utf-8"))
+    if data.shots is not None and player_id in data.shots:
+        digest.update(data.shots.player_array(player_id).tobytes())
+    return digest.hexdigest()
+
+
+def init_worker(directory):
+    global worker_data
+    worker_data = PlayerData(directory)
+
+
+def build_bundle(player_id, output):
+    """Writes <player_id>.<content hash>.json and returns its file name.
+
+    The name changes whenever the content does, so a CDN can cache bundles forever.
+    """
+    body = to_json(worker_data.player_detail(player_id)).encode("utf-8")
+    filename = f"{player_id}.{hashlib.sha1(body).hexdigest()[:12]}.json"
+    path = os.path.join(output, filename)
+    if not os.path.exists(path):
+        with open(path + ".tmp", "wb") as f:
+            f.write(body)
+        os.replace(path + ".tmp", path)
+    return filename
+
+
+def load_manifest(output):
+    path = os.path.join(output, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_json(value, path):
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        f.write(to_json(value))
+    os.replace(path + ".tmp", path)
+
+
+def build_bundles(directory=".", output=BUNDLE_DIR, workers=None, force=False, chunksize=32):
+    """Writes one JSON bundle per player plus a slim index, rebuilding only changed players.
+
+    The manifest keeps each player's input hash and bundle file; players whose
+    inputs hash the same as last time keep their bundle, and bundles of
+    players no longer in the data are removed. Returns (rebuilt, unchanged, removed).
+    """
+    os.makedirs(output, exist_ok=True)
+    data = PlayerData(directory)
+    manifest = {} if force else load_manifest(output)
+
+    hashes = {player_id: input_hash(data, player_id) for player_id in data.by_id}
+    stale = [player_id for player_id, digest in hashes.items()
+             if manifest.get(player_id, {}).get("inputs") != digest
+             or not os.path.exists(os.path.join(output, manifest[player_id]["file"]))]
+
+    files = {player_id: entry["file"] for player_id, entry in manifest.items() if player_id in hashes}
+    if stale:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(directory,)) as executor:
+            built = executor.map(build_bundle, stale, [output] * len(stale), chunksize=chunksize)
+            files.update(zip(stale, built))
+
+    # Drop bundles that are no longer referenced: removed players and superseded content
+    current = set(files.values())
+    removed = [entry["file"] for entry in manifest.values() if entry["file"] not in current]
+    for filename in removed:
+        path = os.path.join(output, filename)
+        if os.path.exists(path):
+            os.remove(path)
+
+    write_json({"columns": INDEX_COLUMNS + ["file"],
+                "players": {player_id: [data.by_id[player_id].get(column) for column in INDEX_COLUMNS] + [files[player_id]]
+                            for player_id in data.by_id}},
+               os.path.join(output, INDEX_NAME))
+    write_json({player_id: {"inputs": hashes[player_id], "file": files[player_id]} for player_id in hashes},
+               os.path.join(output, MANIFEST_NAME))
+
+    return len(stale), len(hashes) - len(stale), len(removed)
+
+
+def main(directory=".", output=BUNDLE_DIR, workers=None, force=False):
+    rebuilt, unchanged, removed = build_bundles(directory, output, workers, force)
+    print(f"bundles: {rebuilt} rebuilt, {unchanged} unchanged, {removed} removed -> {output}/{INDEX_NAME}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Write one static JSON bundle per player plus an index.')
+    parser.add_argument('--dir', default='.', help='directory with updated_players.csv, stats CSVs and shots.npy')
+    parser.add_argument('--output', default=BUNDLE_DIR)
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='rebuild every bundle')
+    args = parser.parse_args()
+    main(args.dir, args.output, args.workers, args.force)
@@ -0,0 +1,115 @@
+"""One entry point for every data step: python cli.py <command> [options].
+
+Only argparse is imported up front; each command imports its module (and so
+pandas, requests, lxml, ...) when it runs. Options left out on the command
+line are not passed at all, so the module's own defaults apply.
+"""
+import argparse
+import importlib
+import sys
+
+# command: (module, function, help, [(flags, argparse options), ...], fixed keyword arguments)
+# Each option's dest is the keyword argument it is passed as.
+COMMANDS = {
+    'scrape-bios': ('player', 'main', 'scrape the letter index pages to temp_bio.csv', [
+        (['--workers'], dict(type=int, help='pages fetched concurrently')),
+        (['--rate'], dict(dest='requests_per_second', type=float, help='requests per second shared by all workers')),
+    ], dict(bios=True, draft=False)),
+    'scrape-draft': ('player', 'main', 'scrape draft history to nba_draft_data.csv', [
+        (['--workers'], dict(type=int, help='pages fetched concurrently')),
+        (['--start'], dict(dest='start_year', type=int, help='first draft year')),
+        (['--end'], dict(dest='end_year', type=int, help='last draft year (default: this year)')),
+        (['--rate'], dict(dest='requests_per_second', type=float, help='requests per second shared by all workers')),
+    ], {}),
+    'scrape-players': ('bball_scraper', 'main', 'scrape player pages to the stats, team and championship CSVs', [
+        (['--workers'], dict(type=int, help='player pages fetched concurrently')),
+        (['--rate'], dict(dest='requests_per_second', type=float, help='requests per second shared by all workers')),
+        (['--stream'], dict(action='store_true', help='append rows as players finish and resume from the journal')),
+    ], {}),
+    'scrape-shots': ('nba_shot', 'scrape', 'download and parse shot charts into the shot store', [
+        (['--concurrent'], dict(action='store_true', help='download players in parallel over a page pool')),
+        (['--pages'], dict(dest='pool_size', type=int, help='pages kept open on the browser')),
+        (['--in-flight'], dict(dest='max_in_flight', type=int, help='maximum downloads running at once')),
+        (['--host-delay'], dict(type=float, help='seconds between requests to one host')),
+        (['--backend'], dict(choices=['browser', 'http'], help='fetch pages with headless Chromium or plain HTTP')),
+        (['--workers'], dict(type=int, help='parser processes (default: one per core)')),
+        (['--json'], dict(dest='write_json', action='store_true', help='also write the legacy shots.json')),
+        (['--ndjson'], dict(metavar='PATH', help='stream players to PATH (gzip if .gz) while parsing')),
+        (['--refresh'], dict(dest='refresh_only', action='store_true',
+                             help='only re-fetch players with new games or stale pages')),
+        (['--ttl'], dict(type=float, help='seconds before a page is re-fetched anyway')),
+        (['--seasons'], dict(type=int, nargs=2, metavar=('FIRST', 'LAST'),
+                             help='backfill these seasons (end years) into per-season stores')),
+    ], {}),
+    'awards': ('awards', 'main', 'scrape award winners to backend/data/Player_awards.csv', [], {}),
+    'all-nba': ('all-nba', 'main', 'scrape All-NBA and All-Defensive teams', [], {}),
+    'combine-players': ('db', 'combine_bio_draft_data', 'join bios, draft and teams into updated_players.csv', [], {}),
+    'load-db': ('db', 'main', 'load the CSVs into the database', [
+        (['--delta'], dict(action='store_true', help='only send rows changed since the last sync')),
+        (['--sqlite'], dict(dest='sqlite_path', metavar='PATH', help='load into a local SQLite file instead')),
+    ], {}),
+    'percentiles': ('percentiles', 'main', 'write league percentile ranks to percentiles.json', [
+        (['--min-games'], dict(type=int, help='games needed to count in the population')),
+        (['--by-position'], dict(action='store_true', help='rank within G / F / C groups')),
+        (['--rapport'], dict(dest='rapport_file', help='rapport_ranking.js for Off/Def/Tot')),
+        (['--frontend'], dict(dest='frontend_file', help="copy for the frontend ('' to skip)")),
+    ], {}),
+    'shot-zones': ('shot_zones', 'main', 'aggregate the shot store into shot_zones.json', [], {}),
+    'bundles': ('bundles', 'main', 'write per-player static JSON bundles', [
+        (['--dir'], dict(dest='directory', help='directory with updated_players.csv, stats CSVs and shots.npy')),
+        (['--output'], dict(help='bundle directory')),
+        (['--workers'], dict(type=int, help='worker processes (default: CPU count)')),
+        (['--force'], dict(action='store_true', help='rebuild every bundle')),
+    ], {}),
+    'serve': ('query_service', 'main', 'serve players, stats and shots over HTTP', [
+        (['--dir'], dict(dest='directory', help='directory with updated_players.csv, stats CSVs and shots.npy')),
+        (['--host'], dict()),
+        (['--port'], dict(type=int)),
+        (['--cache'], dict(dest='cache_size', type=int, help='responses kept in the LRU cache')),
+        (['--verbose'], dict(action='store_true', help='log every request')),
+    ], {}),
+    'pipeline': ('pipeline', 'main', 'run the whole pipeline, skipping up-to-date stages', [
+        (['only'], dict(nargs='*', metavar='stage', help='stages to run, with what they depend on (default: all)')),
+        (['--jobs'], dict(type=int, help='stages run at once')),
+        (['--force'], dict(nargs='*', help="rerun these stages even if up to date ('all')")),
+        (['--dir'], dict(dest='directory', help="data directory (default: the scripts' directory)")),
+        (['--sqlite'], dict(dest='sqlite_path', metavar='PATH', help='load into a local SQLite file instead')),
+    ], {}),
+    'bench': ('bench_parsers', 'main', 'benchmark the parsers on the stored fixtures', [
+        (['names'], dict(nargs='*', metavar='parser', help='parsers to run (default: all)')),
+        (['--baseline'], dict(dest='baseline_file', help='committed output baseline (rows and digests)')),
+        (['--local-baseline'], dict(dest='local_file', help="this machine's timings and memory")),
+        (['--save-baseline'], dict(dest='save', action='store_true', help='record this run as the baseline')),
+        (['--tolerance'], dict(type=float, help='allowed fractional regression')),
+        (['--min-seconds'], dict(type=float, help='measured time per parser')),
+    ], {}),
+}
+
+# Commands whose function reports success; False becomes exit status 1
+CHECKED = {'load-db', 'pipeline', 'bench'}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='cli.py', description='NBA data pipeline commands.')
+    commands = parser.add_subparsers(dest='command', metavar='command', required=True)
+    for name, (_, _, summary, arguments, _) in COMMANDS.items():
+        command = commands.add_parser(name, help=summary, description=summary, argument_default=argparse.SUPPRESS)
+        for flags, options in arguments:
+            command.add_argument(*flags, **options)
+    return parser
+
+
+def run(argv=None):
+    args = vars(build_parser().parse_args(argv))
+    name = args.pop('command')
+    module_name, function_name, _, _, fixed = COMMANDS[name]
+
+    # Positional nargs='*' arguments are always set; empty means "all", i.e. the default
+    options = {key: value for key, value in args.items() if value != []}
+    function = getattr(importlib.import_module(module_name), function_name)
+    result = function(**fixed, **options)
+    return 1 if name in CHECKED and not result else 0
+
+
+if __name__ == '__main__':
+    sys.exit(run())
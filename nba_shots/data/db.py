@@ -1,29 +1,78 @@
+import argparse
 import json
 import pandas as pd
 import numpy as np
-from supabase import create_client
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-
-supabase_url = os.getenv("SUPABASE_URL")
-supabase_key = os.getenv("SUPABASE_KEY")
-
-if not supabase_url or not supabase_key:
-    raise ValueError("Missing Supabase credentials. Check .env file.")
-
-supabase = create_client(supabase_url, supabase_key)
-
-
-
-def load_players_data(filename='updated_players.csv'):
-    """Load players data from CSV and return player_id mapping."""
+import sys
+from bulk_load import CHUNK_SIZE, WORKERS, bulk_upsert, frame_to_records
+from delta_sync import sync_table
+from player_registry import load_registry
+from player_resolver import attach_player_ids, load_resolver
+from sinks import SQLiteSink, SupabaseSink
+
+_default_sink = None
+
+
+def get_sink():
+    """The sink loaders write to when none is passed: Supabase, created on first use."""
+    global _default_sink
+    if _default_sink is None:
+        _default_sink = SupabaseSink()
+    return _default_sink
+
+
+def set_sink(sink):
+    global _default_sink
+    _default_sink = sink
+
+PLAYER_COLUMNS = {
+    'player': ('Player', None),
+    'from': ('From', None),
+    'to': ('To', None),
+    'position': ('Position', None),
+    'height': ('Height', None),
+    'weight': ('Weight', 'float'),
+    'birth_date': ('birth_date', None),
+    'colleges': ('College', None),
+    'player_id': ('bball_id', None),
+    'draft_year': ('draft_year', 'int'),
+    'draft_round': ('draft_round', 'int'),
+    'draft_number': ('draft_number', 'int'),
+    'team': ('Team', None),
+}
+
+AWARD_COLUMNS = {
+    'season': ('Season', None),
+    'award': ('Award', None),
+    'player_id': ('bball_id', None),
+}
+
+STAT_COLUMNS = {
+    'player_id': ('Player_id', None),
+    'g': ('G', 'int'),
+    'pts': ('PTS', 'float'),
+    'trb': ('TRB', 'float'),
+    'ast': ('AST', 'float'),
+    'fg_per': ('FG%', 'float'),
+    'fg3_per': ('FG3%', 'float'),
+    'ft_per': ('FT%', 'float'),
+    'efg_per': ('eFG%', 'float'),
+    'per': ('PER', 'float'),
+    'ws': ('WS', 'float'),
+}
+
+
+
+def load_players_data(filename='updated_players.csv', chunk_size=CHUNK_SIZE, workers=WORKERS, sink=None, delta=False):
+    """Load players data from CSV and return player_id mapping.
+
+    With delta=True only players added, changed or removed since the last sync
+    are sent, and the mapping only covers the rows that were sent.
+    """
     if not os.path.exists(filename):
         raise FileNotFoundError(f"CSV file '{filename}' not found.")
     
-    df = pd.read_csv(filename)
+    df = load_registry(filename).frame()
     
     # Ensure necessary columns exist
     required_columns = {'Player', 'Team','From', 'To', 'Position', 'Height', 'Weight', 'Birth Date', 'College', 'draft_year', 'draft_round', 'draft_number', 'bball_id'}
@@ -33,47 +82,24 @@ def load_players_data(filename='updated_players.csv'):
     
     # Convert date field safely
     df['birth_date'] = pd.to_datetime(df['Birth Date'], errors='coerce').dt.strftime('%Y-%m-%d')
-    
-    # Clean data using applymap
-    df = df.where(pd.notna(df), None)
-
-    players_data = []
-    for _, row in df.iterrows():
-        player = {
-            'player': row['Player'],
-            'from': row['From'],
-            'to': row['To'],
-            'position': row['Position'] if pd.notna(row['Position']) else None,
-            'height': row['Height'] if pd.notna(row['Height']) else None,
-            'weight': float(row['Weight']) if pd.notna(row['Weight']) else None,
-            'birth_date': row['birth_date'] if pd.notna(row['birth_date']) else None,
-            'colleges': row['College'] if pd.notna(row['College']) else None,
-            'player_id': row['bball_id'] if pd.notna(row['bball_id']) else None,
-            'draft_year': int(row['draft_year']) if pd.notna(row['draft_year']) else None,
-            'draft_round': int(row['draft_round']) if pd.notna(row['draft_round']) else None,
-            'draft_number': int(row['draft_number']) if pd.notna(row['draft_number']) else None,
-             'team': row['Team'],
-        }
-        players_data.append(player)
-        #print(json.dumps(players_data[:5], indent=2))  # Print first 5 entries for debugging
-
-    players_data = list({player["player_id"]: player for player in players_data}.values())
 
-    # Insert players and get their IDs
-    #result = supabase.table("player").upsert(players_data).execute()
-    result = supabase.table("player").upsert(players_data, on_conflict=["player_id"]).execute()
+    players_data = frame_to_records(df, PLAYER_COLUMNS)
 
+    # Insert players and get their IDs
+    if delta:
+        data = sync_table(sink or get_sink(), "player", players_data, ["player_id"], chunk_size, workers)
+    else:
+        data, report = bulk_upsert(sink or get_sink(), "player", players_data, ["player_id"], chunk_size, workers)
 
-    
     # Create mapping of player names to their IDs
-    player_mapping = {df.iloc[i]['Player']: player['id'] for i, player in enumerate(result.data)}
+    player_mapping = {player['player']: player['id'] for player in data}
 
     return player_mapping
 
 
 
 
-def load_awards_data(filename='backend/data/updated_awards_full.csv'):
+def load_awards_data(filename='backend/data/updated_awards_full.csv', chunk_size=CHUNK_SIZE, workers=WORKERS, sink=None, delta=False):
     """Load awards data from CSV and return a list of award records."""
     if not os.path.exists(filename):
         raise FileNotFoundError(f"CSV file '{filename}' not found.")
@@ -88,26 +114,24 @@ def load_awards_data(filename='backend/data/updated_awards_full.csv'):
     
     df['Season'] = df['Season'].astype(str)
     df['Award'] = df['Award'].astype(str)
-    df = df.where(pd.notna(df), None)
-
-    awards_data = []
-    for _, row in df.iterrows():
-        award = {
-            'season': row['Season'],
-            'award': row['Award'],
-            'player_id' : row['bball_id']
-        }
-        awards_data.append(award)
-        
 
-    result = supabase.table("awards").upsert(awards_data, on_conflict=[ "id"]).execute()
+    if delta:
+        # Awards have no id in the CSV. A player can hold the same award more than once
+        # with no season (championship rows), so the natural key numbers the repeats.
+        df['occurrence'] = df.groupby(['bball_id', 'Season', 'Award'], dropna=False).cumcount()
+        awards_data = frame_to_records(df, {**AWARD_COLUMNS, 'occurrence': ('occurrence', 'int')})
+        sync_table(sink or get_sink(), "awards", awards_data, ["player_id", "season", "award", "occurrence"],
+                   chunk_size, workers)
+    else:
+        awards_data = frame_to_records(df, AWARD_COLUMNS)
+        bulk_upsert(sink or get_sink(), "awards", awards_data, ["id"], chunk_size, workers)
     
 
     return awards_data
     
     
     
-def load_stats(filename,stats_type):
+def load_stats(filename,stats_type, chunk_size=CHUNK_SIZE, workers=WORKERS, sink=None, delta=False):
         if not os.path.exists(filename):
             raise FileNotFoundError(f"CSV file '{filename}' not found.")
         
@@ -119,31 +143,13 @@ def load_stats(filename,stats_type):
         if missing_columns:
             raise ValueError(f"Missing columns in CSV: {missing_columns}")
         
-     
-        df.replace('-', None, inplace=True)  
-        df = df.where(pd.notna(df), None)  
-
-
-        stats_data = []
-        
-        for _, row in df.iterrows():
-            stat = {
-                'player_id': row['Player_id'],
-                'g': int(row['G']) if pd.notna(row['G']) else None,  # Ensure it's an integer
-                'pts': float(row['PTS']) if pd.notna(row['PTS']) else None,
-                'trb': float(row['TRB']) if pd.notna(row['TRB']) else None,
-                'ast': float(row['AST']) if pd.notna(row['AST']) else None,
-                'fg_per': float(row['FG%']) if pd.notna(row['FG%']) else None,
-                'fg3_per': float(row['FG3%']) if pd.notna(row['FG3%']) else None,
-                'ft_per': float(row['FT%']) if pd.notna(row['FT%']) else None,
-                'efg_per': float(row['eFG%']) if pd.notna(row['eFG%']) else None,
-                'per': float(row['PER']) if pd.notna(row['PER']) else None,
-                'ws': float(row['WS']) if pd.notna(row['WS']) else None,
-            }
-            
-            stats_data.append(stat)
+        # '-' placeholders become None during numeric conversion
+        stats_data = frame_to_records(df, STAT_COLUMNS)
           
-        result = supabase.table(stats_type).upsert(stats_data, on_conflict=[ "id"]).execute()
+        if delta:
+            sync_table(sink or get_sink(), stats_type, stats_data, ["player_id"], chunk_size, workers)
+        else:
+            bulk_upsert(sink or get_sink(), stats_type, stats_data, ["id"], chunk_size, workers)
         
 
         return stats_data
@@ -151,44 +157,41 @@ def load_stats(filename,stats_type):
     
 def combine_bio_draft_data():
   
-    file_path = 'backend/data/'
-    players_df = pd.read_csv('Player.csv').drop(['Team'], axis=1)
+    players_df = load_registry('Player.csv').frame().drop(['Team'], axis=1)
     teams_df = pd.read_csv('player_team.csv').drop(['Unnamed: 0'],axis=1)
     #print(players_df)
     
-    #player_df2 = pd.merge(players_df,teams_df, on='Player')
-    player_df2 = players_df.merge(teams_df, on="Player", how="left")
-    #player_df2.fillna("Unknown", inplace=True)
+    player_df2 = players_df.copy()
+    if 'Player_id' in teams_df:
+        # Join on the id each team row was scraped under, so players sharing a name keep their own team
+        team_by_id = dict(zip(teams_df['Player_id'], teams_df['Team']))
+        player_df2['Team'] = player_df2['bball_id'].map(team_by_id)
+    else:
+        # player_team.csv written before rows carried Player_id: fall back to the name
+        team_by_name = dict(zip(teams_df['Player'], teams_df['Team']))
+        player_df2['Team'] = player_df2['Player'].map(team_by_name)
+    player_df2['Team'] = player_df2['Team'].fillna("Unknown")
     player_df2.to_csv('updated_players.csv', index=False)
     print(player_df2)
-    #pd.merge(df, df2, on=['Player', 'Season', 'Award', 'Team'], how='outer')
-    
-    # file_path = 'backend/data/'
-    # champ_df = pd.read_csv(file_path+'championships.csv')
-    # awards_df = pd.read_csv(file_path+'awards_final.csv')
-    
-    
-    # champ_df.drop('Player_id', axis=1, inplace=True)
-    # awards_df.drop('Unnamed: 0', axis=1, inplace=True)
-    # awards_df.drop('Unnamed: 0.1', axis=1, inplace=True)
 
-    # merged_awards_df = pd.concat([awards_df,champ_df])
 
+def combine_awards_data(file_path='backend/data/'):
+    """Combines awards and championships and attaches bball_id through the player resolver."""
+    champ_df = pd.read_csv(file_path+'championships.csv')
+    awards_df = pd.read_csv(file_path+'awards_final.csv')
+    awards_df = awards_df.drop(columns=['Unnamed: 0', 'Unnamed: 0.1'], errors='ignore')
 
-    # #removing NaN values 
-    # awards_df2 = merged_awards_df.where(pd.notnull(merged_awards_df), None)
-   
-    
-    
-    # players_df = pd.read_csv('Player.csv')
-    
-    # #players_df.drop(['Team', 'From', 'To', 'draft_year', 'draft_round', 'draft_number'], axis=1, inplace=True)
-    # player_ids = players_df[['Player','bball_id']]
-    # player_ids.to_csv('player_ids.csv', index=False)
+    # Awards only have names; the season picks between players who share one
+    resolver = load_resolver('Player.csv')
+    attach_player_ids(awards_df, resolver, 'Player', 'Season')
+
+    # Championship rows were scraped per player and already carry the id
+    champ_df = champ_df.rename(columns={'Player_id': 'bball_id'})
 
-    # awards_df2 = pd.merge(awards_df2,player_ids, on='Player')
-    # print(awards_df2)
-    # awards_df2.to_csv('updated_awards_full.csv')
+    merged_awards_df = pd.concat([awards_df, champ_df])
+    merged_awards_df = merged_awards_df.where(pd.notnull(merged_awards_df), None)
+    merged_awards_df.to_csv('updated_awards_full.csv')
+    return merged_awards_df
     
 #combine_bio_draft_data()
 
@@ -219,10 +222,14 @@ def combine_bio_draft_data():
         
 #combine_bio_draft_data()
 
-def main():
+def main(delta=False, sqlite_path=None):
+    """Loads the CSVs into the database; returns False when the load failed."""
+    if sqlite_path:
+        set_sink(SQLiteSink(sqlite_path))
+
     try:
         #print("Loading players data...")
-        player_mapping = load_players_data()
+        player_mapping = load_players_data(delta=delta)
         #print("Database setup complete!")
         
         #awards_mapping = load_awards_data()
@@ -233,6 +240,12 @@ def main():
         
     except Exception as e:
         print(f"An error occurred: {str(e)}")
+        return False
+    return True
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Load the scraped CSVs into the database.")
+    parser.add_argument("--delta", action="store_true", help="only send rows changed since the last sync")
+    parser.add_argument("--sqlite", metavar="PATH", help="load into a local SQLite file instead of Supabase")
+    args = parser.parse_args()
+    sys.exit(0 if main(args.delta, args.sqlite) else 1)
\ No newline at end of file
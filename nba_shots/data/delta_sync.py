@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import re
+from collections import Counter
+import pandas as pd
+from bulk_load import CHUNK_SIZE, WORKERS, bulk_upsert, chunked
+
+MANIFEST_DIR = "sync_manifests"
+
+
+def row_keys(records, key):
+    """Natural key of every record as a JSON list, e.g. '["jamesle01"]' or '["jamesle01","2012-13","MVP"]'.
+
+    JSON keeps values containing separators and None (null) distinct from other keys.
+    """
+    return [json.dumps([record.get(column) for column in key], separators=(",", ":"), default=str)
+            for record in records]
+
+
+def row_hashes(records):
+    """Content hash of every record, computed column-wise by pandas."""
+    if not records:
+        return []
+    frame = pd.DataFrame(records).astype(str)
+    return [format(h, "016x") for h in pd.util.hash_pandas_object(frame, index=False)]
+
+
+def target_directory(target, directory=MANIFEST_DIR):
+    """Manifests are kept per sink target, so syncing one database says nothing about another."""
+    name = re.sub(r"[^\w.-]+", "_", target)[:60]
+    return os.path.join(directory, f"{name}-{hashlib.sha1(target.encode()).hexdigest()[:8]}")
+
+
+def manifest_path(table, target, directory=MANIFEST_DIR):
+    return os.path.join(target_directory(target, directory), f"{table}.json")
+
+
+def load_manifest(table, target, directory=MANIFEST_DIR):
+    path = manifest_path(table, target, directory)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(table, manifest, target, directory=MANIFEST_DIR):
+    os.makedirs(target_directory(target, directory), exist_ok=True)
+    with open(manifest_path(table, target, directory), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, separators=(",", ":"))
+
+
+def diff_records(records, key, manifest):
+    """Splits records against the last synced manifest.
+
+    Returns (inserted, changed, deleted keys, new manifest). Raises ValueError
+    when two records share a natural key, since only one of them could be kept.
+    """
+    keys = row_keys(records, key)
+    current = dict(zip(keys, row_hashes(records)))
+    if len(current) < len(keys):
+        duplicates = sorted({k for k, count in Counter(keys).items() if count > 1})
+        raise ValueError(f"{len(keys) - len(current)} records repeat a natural key {key}, "
+                         f"e.g. {', '.join(duplicates[:3])}")
+
+    inserted = [record for k, record in zip(keys, records) if k not in manifest]
+    changed = [record for k, record in zip(keys, records) if k in manifest and manifest[k] != current[k]]
+    deleted = [k for k in manifest if k not in current]
+    return inserted, changed, deleted, current
+
+
+def delete_rows(sink, table, key, deleted, chunk_size=CHUNK_SIZE):
+    """Deletes rows by natural key, a chunk of keys per request."""
+    for keys in chunked(deleted, chunk_size):
+        sink.delete(table, key, [tuple(json.loads(k)) for k in keys])
+
+
+def sync_table(sink, table, records, key, chunk_size=CHUNK_SIZE, workers=WORKERS, directory=MANIFEST_DIR):
+    """Sends only inserted, changed and deleted rows since the last sync of `table` to this sink's target.
+
+    The manifest is only advanced when every chunk went through: a failed
+    upsert (BulkLoadError) or delete propagates and the next run retries the
+    whole diff. Returns the rows the server sent back.
+    """
+    manifest = load_manifest(table, sink.target, directory)
+    earlier = [k for k in manifest if len(json.loads(k)) != len(key)]
+    if earlier:
+        # Synced under an earlier, shorter natural key (key columns are only ever appended):
+        # remove those rows by the old key and send the table afresh
+        delete_rows(sink, table, key[:len(json.loads(earlier[0]))], earlier, chunk_size)
+        save_manifest(table, {}, sink.target, directory)
+        manifest = {}
+    inserted, changed, deleted, current = diff_records(records, key, manifest)
+    print(f"{table}: {len(inserted)} inserted, {len(changed)} changed, {len(deleted)} deleted, "
+          f"{len(current) - len(inserted) - len(changed)} unchanged")
+
+    data = []
+    if inserted or changed:
+        data, _ = bulk_upsert(sink, table, inserted + changed, key, chunk_size, workers)
+    if deleted:
+        delete_rows(sink, table, key, deleted, chunk_size)
+
+    save_manifest(table, current, sink.target, directory)
+    return data
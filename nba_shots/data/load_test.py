@@ -0,0 +1,112 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from urllib.parse import urlparse
+
+CLIENTS = 4
+SECONDS = 10.0
+
+
+def percentile(latencies, q):
+    if not latencies:
+        return 0.0
+    latencies = sorted(latencies)
+    return latencies[min(int(q * len(latencies)), len(latencies) - 1)]
+
+
+def request_paths(player_ids, list_share=0.3):
+    """An endless mix of /player/{id} and paged, filtered /players requests."""
+    filters = ['', 'name=james', 'team=lakers', 'position=g', 'name=a&position=f']
+    while True:
+        if random.random() < list_share:
+            query = random.choice(filters)
+            page = f"page={random.randint(1, 5)}"
+            yield f"/players?{query + '&' if query else ''}{page}"
+        else:
+            yield f"/player/{random.choice(player_ids)}"
+
+
+async def fetch(reader, writer, host, path, headers):
+    """One GET over an open keep-alive connection; returns (status, headers, body).
+
+    Parses only the status line and headers, so the client's own cost stays
+    small next to the server's.
+    """
+    lines = [f'GET {path} HTTP/1.1', f'Host: {host}'] + [f'{name}: {value}' for name, value in headers.items()]
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+    head = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+    response_headers = {}
+    for line in head[1:]:
+        name, _, value = line.partition(':')
+        response_headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(response_headers.get('content-length', 0)))
+    return int(head[0].split()[1]), response_headers, body
+
+
+async def client(url, paths, deadline, revalidate, results):
+    """One keep-alive connection issuing requests until the deadline."""
+    reader, writer = await asyncio.open_connection(url.hostname, url.port)
+    etags = {}
+
+    while time.perf_counter() < deadline:
+        path = next(paths)
+        headers = {'Accept-Encoding': 'gzip'}
+        if revalidate and path in etags:
+            headers['If-None-Match'] = etags[path]
+
+        start = time.perf_counter()
+        try:
+            status, response_headers, _ = await fetch(reader, writer, url.hostname, path, headers)
+        except (asyncio.IncompleteReadError, OSError):
+            results['statuses']['error'] += 1
+            writer.close()
+            reader, writer = await asyncio.open_connection(url.hostname, url.port)
+            continue
+        results['latencies'].append(time.perf_counter() - start)
+        results['statuses'][status] += 1
+        if 'etag' in response_headers:
+            etags[path] = response_headers['etag']
+
+    writer.close()
+
+
+async def run(base, clients, seconds, revalidate):
+    url = urlparse(base)
+    reader, writer = await asyncio.open_connection(url.hostname, url.port)
+    _, _, body = await fetch(reader, writer, url.hostname, '/players', {})
+    player_ids = [player['player_id'] for player in json.loads(body)]
+    writer.close()
+
+    results = {'latencies': [], 'statuses': Counter()}
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    await asyncio.gather(*(client(url, request_paths(player_ids), deadline, revalidate, results)
+                           for _ in range(clients)))
+    return results, time.perf_counter() - start
+
+
+def main(base='http://127.0.0.1:8000', clients=CLIENTS, seconds=SECONDS, revalidate=False):
+    """Hammers a running query_service.py and prints throughput and latency percentiles."""
+    results, elapsed = asyncio.run(run(base, clients, seconds, revalidate))
+
+    latencies = results['latencies']
+    print(f"{len(latencies)} requests from {clients} clients in {elapsed:.1f}s "
+          f"({len(latencies) / elapsed:.0f} req/s)")
+    print(f"status: {dict(results['statuses'])}")
+    for label, q in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99)):
+        print(f"{label}: {percentile(latencies, q) * 1000:.2f} ms")
+    print(f"max: {max(latencies, default=0) * 1000:.2f} ms")
+    return latencies
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Load-test a running query_service.py.')
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--clients', type=int, default=CLIENTS, help='concurrent keep-alive connections')
+    parser.add_argument('--seconds', type=float, default=SECONDS)
+    parser.add_argument('--revalidate', action='store_true', help='send If-None-Match with ETags seen before')
+    args = parser.parse_args()
+    main(args.url, args.clients, args.seconds, args.revalidate)
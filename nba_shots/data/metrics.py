@@ -0,0 +1,224 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+METRICS_DIR = "metrics"
+
+
+def quantile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+class StageMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.bytes = 0
+        self.statuses = defaultdict(int)
+        self.latencies = []
+        self.retries = 0
+        self.sleep_seconds = 0.0
+        self.parse_seconds = 0.0
+        self.parsed_pages = 0
+        self.rows = 0
+        self.wall_seconds = 0.0
+
+    def bound(self):
+        """Which of network, rate-limit sleeps or parsing took the most time."""
+        costs = {
+            "network": sum(self.latencies),
+            "politeness": self.sleep_seconds,
+            "parser": self.parse_seconds,
+        }
+        if not any(costs.values()):
+            return None
+        return max(costs, key=costs.get) + "-bound"
+
+    def summary(self):
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "bytes": self.bytes,
+            "statuses": dict(self.statuses),
+            "latency_seconds": {
+                "total": sum(self.latencies),
+                "p50": quantile(self.latencies, 0.5),
+                "p95": quantile(self.latencies, 0.95),
+                "max": max(self.latencies, default=0.0),
+            },
+            "retries": self.retries,
+            "rate_limit_sleep_seconds": self.sleep_seconds,
+            "parse_seconds": self.parse_seconds,
+            "parsed_pages": self.parsed_pages,
+            "rows": self.rows,
+            "wall_seconds": self.wall_seconds,
+            "bound": self.bound(),
+        }
+
+
+class RunMetrics:
+    """Per-request and per-stage counters for one scraper run.
+
+    Safe to share between worker threads and asyncio tasks. Latencies, sleeps
+    and parse times are summed across workers, so with concurrency they can
+    exceed the stage's wall time; compare them with each other, not with it.
+    """
+
+    def __init__(self, run="scrape"):
+        self.run = run
+        self.started_at = time.time()
+        self.stages = defaultdict(StageMetrics)
+        self.requests = []  # one entry per HTTP request
+        self.lock = threading.Lock()
+
+    def record_request(self, stage, url, status=None, nbytes=0, latency=0.0, error=None):
+        with self.lock:
+            metrics = self.stages[stage]
+            metrics.requests += 1
+            metrics.bytes += nbytes
+            metrics.latencies.append(latency)
+            metrics.statuses[str(status) if status is not None else "error"] += 1
+            if error is not None:
+                metrics.errors += 1
+            self.requests.append({"stage": stage, "url": url, "status": status, "bytes": nbytes,
+                                  "latency": round(latency, 4), "error": error})
+
+    def record_retry(self, stage):
+        with self.lock:
+            self.stages[stage].retries += 1
+
+    def record_sleep(self, stage, seconds):
+        if seconds > 0:
+            with self.lock:
+                self.stages[stage].sleep_seconds += seconds
+
+    def record_parse(self, stage, seconds, rows=0, pages=1):
+        with self.lock:
+            metrics = self.stages[stage]
+            metrics.parse_seconds += seconds
+            metrics.parsed_pages += pages
+            metrics.rows += rows
+
+    @contextmanager
+    def parsing(self, stage):
+        """Times a parse; set `.rows` (and `.pages` for a batch) on the yielded object."""
+        start = time.perf_counter()
+        timer = SimpleNamespace(rows=0, pages=1)
+        try:
+            yield timer
+        finally:
+            self.record_parse(stage, time.perf_counter() - start, timer.rows, timer.pages)
+
+    @contextmanager
+    def stage(self, stage):
+        """Adds the wall time of the block to the stage."""
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            with self.lock:
+                self.stages[stage].wall_seconds += time.perf_counter() - start
+
+    def summary(self):
+        with self.lock:
+            return {
+                "run": self.run,
+                "started_at": self.started_at,
+                "seconds": time.time() - self.started_at,
+                "stages": {name: metrics.summary() for name, metrics in self.stages.items()},
+            }
+
+    def write_json(self, filename):
+        summary = self.summary()
+        with self.lock:
+            summary["requests"] = list(self.requests)
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+    def prometheus(self):
+        """The stage counters in Prometheus text exposition format."""
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{v}"' for k, v in {"run": self.run, **labels}.items())
+                lines.append(f"{name}{{{label_text}}} {value}")
+
+        stages = self.summary()["stages"]
+        metric("scraper_requests_total", "counter", "HTTP requests made.",
+               [({"stage": stage, "status": status}, count)
+                for stage, s in stages.items() for status, count in s["statuses"].items()])
+        metric("scraper_response_bytes_total", "counter", "Response body bytes received.",
+               [({"stage": stage}, s["bytes"]) for stage, s in stages.items()])
+        metric("scraper_request_latency_seconds", "summary", "Request latency.",
+               [({"stage": stage, "quantile": q}, s["latency_seconds"][key])
+                for stage, s in stages.items() for q, key in (("0.5", "p50"), ("0.95", "p95"))])
+        lines.extend(f'scraper_request_latency_seconds_sum{{run="{self.run}",stage="{stage}"}} '
+                     f'{s["latency_seconds"]["total"]}' for stage, s in stages.items())
+        lines.extend(f'scraper_request_latency_seconds_count{{run="{self.run}",stage="{stage}"}} {s["requests"]}'
+                     for stage, s in stages.items())
+        metric("scraper_retries_total", "counter", "Retried requests.",
+               [({"stage": stage}, s["retries"]) for stage, s in stages.items()])
+        metric("scraper_rate_limit_sleep_seconds_total", "counter", "Time spent waiting on rate limits.",
+               [({"stage": stage}, s["rate_limit_sleep_seconds"]) for stage, s in stages.items()])
+        metric("scraper_parse_seconds_total", "counter", "Time spent parsing pages.",
+               [({"stage": stage}, s["parse_seconds"]) for stage, s in stages.items()])
+        metric("scraper_rows_total", "counter", "Rows produced by the parsers.",
+               [({"stage": stage}, s["rows"]) for stage, s in stages.items()])
+        metric("scraper_stage_wall_seconds", "gauge", "Wall time of the stage.",
+               [({"stage": stage}, s["wall_seconds"]) for stage, s in stages.items()])
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, filename):
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(self.prometheus())
+
+    def save(self, directory=METRICS_DIR):
+        """Writes <run>_run.json and <run>.prom, and prints one line per stage."""
+        os.makedirs(directory, exist_ok=True)
+        self.write_json(os.path.join(directory, f"{self.run}_run.json"))
+        self.write_prometheus(os.path.join(directory, f"{self.run}.prom"))
+        for stage, s in self.summary()["stages"].items():
+            print(f"{stage}: {s['requests']} requests, {s['bytes'] / 1e6:.1f} MB, "
+                  f"{s['latency_seconds']['total']:.1f}s network, {s['rate_limit_sleep_seconds']:.1f}s rate limit, "
+                  f"{s['parse_seconds']:.1f}s parsing, {s['wall_seconds']:.1f}s wall ({s['bound']})")
+
+
+_run = None
+
+
+def get_run():
+    """The run being recorded, created on first use."""
+    global _run
+    if _run is None:
+        _run = RunMetrics()
+    return _run
+
+
+def set_run(run):
+    global _run
+    _run = run
+    return run
+
+
+def instrumented_get(get, url, stage, **kwargs):
+    """Calls `get(url, **kwargs)` (requests.get or Session.get) and records the request."""
+    start = time.perf_counter()
+    try:
+        response = get(url, **kwargs)
+    except Exception as e:
+        get_run().record_request(stage, url, getattr(getattr(e, "response", None), "status_code", None),
+                                 latency=time.perf_counter() - start, error=type(e).__name__)
+        raise
+    get_run().record_request(stage, url, response.status_code, len(response.content),
+                             time.perf_counter() - start)
+    return response
@@ -1,10 +1,22 @@
+import argparse
 import asyncio
+import hashlib
 import os
 import json
+import random
+import re
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+import aiohttp
 import pandas as pd
 from pyppeteer import launch
-from bs4 import BeautifulSoup
 import aiofiles
+from shot_parser import iter_shot_files, parse_shots_html, parse_shot_files
+from shot_store import SEASONS_DIR, season_directory, update_shot_store, write_seasons_index, write_shot_store
+from metrics import RunMetrics, get_run, set_run
+from player_registry import load_registry
+from shot_stream import NdjsonWriter
 
 TIMEOUT = 20000  # 20s timeout
 USER_AGENT = (
@@ -12,10 +24,25 @@ USER_AGENT = (
     "(KHTML, like Gecko) Chrome/47.0.2526.111 Safari/537.36"
 )
 
-# Read player IDs
-player_ids_df = pd.read_csv('updated_players.csv')
-filtered_players = player_ids_df[player_ids_df["To"] == 2025.0]
-player_ids = list(filtered_players["player_id"])
+# Concurrent download settings
+POOL_SIZE = 4  # pages kept open on the shared browser
+MAX_IN_FLIGHT = 4  # downloads running at the same time
+HOST_DELAY = 2.0  # minimum seconds between requests to the same host
+RETRIES = 3
+RETRY_DELAY = 3
+# Incremental refresh settings
+MANIFEST_FILE = "shots_manifest.json"
+REFRESH_TTL = 7 * 24 * 3600  # re-fetch pages older than a week even if no new games
+
+SHOT_AREA = re.compile(r'class="[^"]*\bshot-area\b')
+STAGE = "shots"  # metrics stage for shot page requests
+
+SEASON = 2025
+
+
+def current_player_ids(filename='updated_players.csv', season=SEASON):
+    """Players whose last season so far is `season`."""
+    return load_registry(filename).last_played_in(season)
 
 async def new_page(browser):
     """Creates a new browser page with custom settings."""
@@ -27,30 +54,266 @@ async def new_page(browser):
 async def fetch_url(browser, url):
     """Fetches a webpage and returns its HTML content."""
     page = await new_page(browser)
-    await page.goto(url, {"timeout": TIMEOUT, "waitUntil": "domcontentloaded"})
+    start = time.perf_counter()
+    response = await page.goto(url, {"timeout": TIMEOUT, "waitUntil": "domcontentloaded"})
     html = await page.content()
+    record_page(url, response, html, start)
     await page.close()
     return html
 
-async def download_shooting_data(browser, player_id):
-    """Downloads and saves the shooting data HTML for each player."""
-    url = f"https://www.basketball-reference.com/players/{player_id[0]}/{player_id}/shooting/2025"
-    html_filename = f"shots_{player_id}.html"  # Unique filename per player
 
-    if os.path.exists(html_filename):
+def record_page(url, response, html, start):
+    """Records a browser navigation; `response` is None when the page came from cache."""
+    status = response.status if response is not None else None
+    get_run().record_request(STAGE, url, status, len(html.encode("utf-8")), time.perf_counter() - start)
+
+
+class PagePool:
+    """A fixed set of reusable pages on one browser."""
+
+    def __init__(self, browser, size=POOL_SIZE):
+        self.browser = browser
+        self.size = size
+        self._pages = asyncio.Queue()
+
+    async def start(self):
+        for _ in range(self.size):
+            await self._pages.put(await new_page(self.browser))
+
+    @asynccontextmanager
+    async def page(self):
+        """Borrows a page; a page that raised is replaced with a fresh one."""
+        page = await self._pages.get()
+        try:
+            yield page
+        except Exception:
+            try:
+                await page.close()
+            except Exception:
+                pass
+            page = await new_page(self.browser)
+            raise
+        finally:
+            await self._pages.put(page)
+
+    async def fetch(self, url):
+        """Fetches a webpage on a pooled page and returns its HTML content."""
+        async with self.page() as page:
+            start = time.perf_counter()
+            response = await page.goto(url, {"timeout": TIMEOUT, "waitUntil": "domcontentloaded"})
+            html = await page.content()
+            record_page(url, response, html, start)
+            return html
+
+    async def close(self):
+        while not self._pages.empty():
+            page = self._pages.get_nowait()
+            await page.close()
+
+
+class HostPacer:
+    """Spaces out requests to the same host by at least `delay` seconds."""
+
+    def __init__(self, delay=HOST_DELAY):
+        self.delay = delay
+        self._next_slot = {}
+        self._lock = asyncio.Lock()
+
+    async def wait(self, url):
+        host = urlparse(url).netloc
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.delay
+        if slot > now:
+            get_run().record_sleep(STAGE, slot - now)
+            await asyncio.sleep(slot - now)
+
+
+class HttpFetcher:
+    """Fetches pages over one keep-alive HTTP session, using the browser only as a fallback."""
+
+    def __init__(self, limit=MAX_IN_FLIGHT, fallback_pages=1):
+        self.limit = limit
+        self.fallback_pages = fallback_pages
+        self._session = None
+        self._browser = None
+        self._fallback = None
+        self._fallback_lock = asyncio.Lock()
+
+    async def start(self):
+        connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit, keepalive_timeout=30)
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            headers={"User-Agent": USER_AGENT},
+            timeout=aiohttp.ClientTimeout(total=TIMEOUT / 1000),
+        )
+
+    async def fetch(self, url):
+        """Fetches a webpage over HTTP; pages without a shot area are re-rendered in the browser."""
+        start = time.perf_counter()
+        try:
+            async with self._session.get(url) as response:
+                response.raise_for_status()
+                body = await response.read()
+        except Exception as e:
+            get_run().record_request(STAGE, url, getattr(e, "status", None),
+                                     latency=time.perf_counter() - start, error=type(e).__name__)
+            raise
+        get_run().record_request(STAGE, url, response.status, len(body), time.perf_counter() - start)
+        html = body.decode(response.get_encoding())
+
+        if has_shot_area(html):
+            return html
+
+        print(f"No shot area in {url}, falling back to the browser...")
+        pool = await self.fallback_pool()
+        return await pool.fetch(url)
+
+    async def fallback_pool(self):
+        """Launches the browser the first time a page needs rendering."""
+        async with self._fallback_lock:
+            if self._fallback is None:
+                print("Starting browser...")
+                self._browser = await launch()
+                self._fallback = PagePool(self._browser, self.fallback_pages)
+                await self._fallback.start()
+        return self._fallback
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+        if self._fallback is not None:
+            await self._fallback.close()
+            await self._browser.close()
+
+
+def has_shot_area(html):
+    return SHOT_AREA.search(html) is not None
+
+def shooting_url(player_id, season=SEASON):
+    return f"https://www.basketball-reference.com/players/{player_id[0]}/{player_id}/shooting/{season}"
+
+def page_filename(player_id, directory="."):
+    return os.path.join(directory, f"shots_{player_id}.html")
+
+async def download_shooting_data(browser, player_id, fetcher=None, overwrite=False, season=SEASON, directory="."):
+    """Downloads and saves the shooting data HTML for each player.
+
+    When a fetcher (e.g. HttpFetcher) is given it is used instead of the browser.
+    """
+    url = shooting_url(player_id, season)
+    html_filename = page_filename(player_id, directory)  # Unique filename per player
+
+    if os.path.exists(html_filename) and not overwrite:
         print(f"Skipping download for {player_id}, file already exists.")
         return
 
     print(f"Downloading HTML for {player_id}...")
-    html = await fetch_url(browser, url)
-    
+    if fetcher is not None:
+        html = await fetcher.fetch(url)
+    else:
+        html = await fetch_url(browser, url)
+
     async with aiofiles.open(html_filename, "w", encoding="utf-8") as f:
         await f.write(html)
 
+async def download_with_retries(fetcher, pacer, player_id, retries=RETRIES, delay=RETRY_DELAY, overwrite=False,
+                                season=SEASON, directory="."):
+    """Downloads one player's HTML with a PagePool or HttpFetcher, retrying with backoff."""
+    url = shooting_url(player_id, season)
+    html_filename = page_filename(player_id, directory)
+
+    if os.path.exists(html_filename) and not overwrite:
+        print(f"Skipping download for {player_id}, file already exists.")
+        return
+
+    for attempt in range(retries):
+        try:
+            await pacer.wait(url)
+            print(f"Downloading HTML for {player_id} (Attempt {attempt + 1})...")
+            html = await fetcher.fetch(url)
+
+            async with aiofiles.open(html_filename, "w", encoding="utf-8") as f:
+                await f.write(html)
+
+            print(f"Downloaded HTML for {player_id}.")
+            return
+
+        except Exception as e:
+            print(f"Error downloading for {player_id}: {e}")
+
+            if attempt == retries - 1:
+                print(f"Skipping {player_id} after {retries} attempts.")
+                return
+
+            backoff = random.uniform(delay, delay * 2)
+            print(f"Retrying in {backoff:.2f} seconds...")
+            get_run().record_retry(STAGE)
+            await asyncio.sleep(backoff)
+
+        delay *= 2
+
+async def download_all(fetcher, pages, max_in_flight=MAX_IN_FLIGHT, host_delay=HOST_DELAY, overwrite=False):
+    """Downloads every (player_id, season, directory) page concurrently through a shared fetcher.
+
+    All pages share one pacer and in-flight limit, however many seasons they span.
+    """
+    pacer = HostPacer(host_delay)
+    in_flight = asyncio.Semaphore(max_in_flight)
+
+    async def run(player_id, season, directory):
+        async with in_flight:
+            await download_with_retries(fetcher, pacer, player_id, overwrite=overwrite, season=season,
+                                        directory=directory)
+
+    await asyncio.gather(*(run(*page) for page in pages))
+
+async def download_players(ids, backend="browser", concurrent=False, pool_size=POOL_SIZE,
+                           max_in_flight=MAX_IN_FLIGHT, host_delay=HOST_DELAY, overwrite=False,
+                           season=SEASON, directory="."):
+    """Downloads one season's shot pages with the chosen backend ("browser" or "http")."""
+    pages = [(player_id, season, directory) for player_id in ids]
+    await download_pages(pages, backend, concurrent, pool_size, max_in_flight, host_delay, overwrite)
+
+async def download_pages(pages, backend="browser", concurrent=False, pool_size=POOL_SIZE,
+                         max_in_flight=MAX_IN_FLIGHT, host_delay=HOST_DELAY, overwrite=False):
+    """Downloads (player_id, season, directory) pages with the chosen backend ("browser" or "http")."""
+    if backend == "http":
+        fetcher = HttpFetcher(max_in_flight)
+        await fetcher.start()
+        try:
+            if concurrent:
+                await download_all(fetcher, pages, max_in_flight, host_delay, overwrite)
+            else:
+                for player_id, season, directory in pages:
+                    await download_shooting_data(None, player_id, fetcher, overwrite, season, directory)
+        finally:
+            await fetcher.close()
+        return
+
+    print("Starting browser...")
+    browser = await launch()
+    try:
+        if concurrent:
+            pool = PagePool(browser, pool_size)
+            await pool.start()
+            try:
+                await download_all(pool, pages, max_in_flight, host_delay, overwrite)
+            finally:
+                await pool.close()
+        else:
+            for player_id, season, directory in pages:
+                await download_shooting_data(browser, player_id, overwrite=overwrite, season=season,
+                                             directory=directory)
+    finally:
+        await browser.close()  # Close browser after downloading all files
+
 async def parse_shots(player_id):
     """Parses the player's shooting data from their specific HTML file."""
     print(f"Parsing shot data for {player_id}...")
-    html_filename = f"shots_{player_id}.html"
+    html_filename = page_filename(player_id)
 
     if not os.path.exists(html_filename):
         print(f"Skipping {player_id}, HTML file not found.")
@@ -59,50 +322,183 @@ async def parse_shots(player_id):
     async with aiofiles.open(html_filename, "r", encoding="utf-8") as f:
         html = await f.read()
 
-    soup = BeautifulSoup(html, "html.parser")
-    shot_divs = soup.select(".shot-area > div")
+    shots = parse_shots_html(html)
+
+    return {"playerId": player_id, "shots": shots} if shots else None
 
-    shots = []
-    for div in shot_divs:
-        style = div.get("style", "")
-        classes = div.get("class", [])
-        tip = div.get("tip", "")
+def parse_players(ids, workers=None, directory="."):
+    """Parses saved pages over the process pool, recording the batch as one parse."""
+    with get_run().stage("parse"), get_run().parsing("parse") as timer:
+        all_shots = parse_shot_files(ids, directory, workers=workers)
+        timer.pages = len(all_shots)
+        timer.rows = sum(len(shots_data["shots"]) for shots_data in all_shots)
+    return all_shots
 
-        try:
-            x = int(style.split("left:")[1].split("px")[0].strip())
-            y = int(style.split("top:")[1].split("px")[0].strip())
-        except (IndexError, ValueError):
-            continue
+def load_manifest(filename=MANIFEST_FILE):
+    """Returns {player_id: {"fetched_at", "sha256", "games"}} for previously fetched pages."""
+    if not os.path.exists(filename):
+        return {}
+    with open(filename, "r", encoding="utf-8") as f:
+        return json.load(f)
 
-        made_shot = "make" in classes
-        shot_pts = 3 if "3-pointer" in tip else 2
+def save_manifest(manifest, filename=MANIFEST_FILE):
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
 
-        shots.append({"x": x, "y": y, "madeShot": made_shot, "shotPts": shot_pts})
-    
-    return {"playerId": player_id, "shots": shots} if shots else None
+def games_played(filename="season_stats.csv"):
+    """Maps player_id to the current season games-played count."""
+    if not os.path.exists(filename):
+        return {}
+    stats = pd.read_csv(filename, usecols=["Player_id", "G"])
+    stats["G"] = pd.to_numeric(stats["G"], errors="coerce")
+    return {player_id: int(g) for player_id, g in zip(stats["Player_id"], stats["G"]) if pd.notna(g)}
 
-async def main():
-    """Main function to download and parse shot data."""
-    print("Starting browser...")
-    browser = await launch()
+def page_hash(html_filename):
+    with open(html_filename, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def players_to_refresh(ids, manifest, games, ttl=REFRESH_TTL, now=None):
+    """Players with no page yet, a changed games-played count, or a page older than `ttl`."""
+    now = time.time() if now is None else now
+    stale = []
+    for player_id in ids:
+        entry = manifest.get(player_id)
+        if entry is None or not os.path.exists(page_filename(player_id)):
+            stale.append(player_id)
+        elif player_id in games and games[player_id] != entry.get("games"):
+            stale.append(player_id)
+        elif now - entry.get("fetched_at", 0) > ttl:
+            stale.append(player_id)
+    return stale
+
+async def refresh(ids, backend="browser", concurrent=False, pool_size=POOL_SIZE, max_in_flight=MAX_IN_FLIGHT,
+                  host_delay=HOST_DELAY, workers=None, ttl=REFRESH_TTL):
+    """Re-fetches only stale players and re-parses only pages whose content changed."""
+    manifest = load_manifest()
+    games = games_played()
+    started = time.time()
+
+    stale = players_to_refresh(ids, manifest, games, ttl, started)
+    print(f"Refreshing {len(stale)} of {len(ids)} players...")
+    with get_run().stage(STAGE):
+        await download_players(stale, backend, concurrent, pool_size, max_in_flight, host_delay, overwrite=True)
+
+    changed = []
+    for player_id in stale:
+        html_filename = page_filename(player_id)
+        if not os.path.exists(html_filename) or os.path.getmtime(html_filename) < started:
+            continue  # download failed, try again next run
+
+        digest = page_hash(html_filename)
+        if digest != manifest.get(player_id, {}).get("sha256"):
+            changed.append(player_id)
+        manifest[player_id] = {"fetched_at": started, "sha256": digest, "games": games.get(player_id)}
+
+    if changed:
+        print(f"{len(changed)} pages changed, re-parsing...")
+        update_shot_store(parse_players(changed, workers), changed)
+    save_manifest(manifest)
+    return changed
+
+async def backfill(seasons, ids=None, backend="browser", concurrent=False, pool_size=POOL_SIZE,
+                   max_in_flight=MAX_IN_FLIGHT, host_delay=HOST_DELAY, workers=None, root=SEASONS_DIR,
+                   overwrite=False):
+    """Downloads and parses several seasons into per-season stores under `root`.
+
+    Each season's pages and shots.npy / shots_index.json live in
+    season_directory(season); pages already saved are kept unless `overwrite`.
+    Without `ids`, every player active in a season is fetched for it. All
+    seasons are downloaded in one batch over a shared fetcher, then parsed
+    one season at a time, and the player -> seasons index is rebuilt.
+    """
+    registry = None if ids is not None else load_registry('updated_players.csv')
+    season_ids = {season: list(ids) if ids is not None else registry.active_in(season) for season in seasons}
+
+    pages = []
+    for season, player_ids in season_ids.items():
+        os.makedirs(season_directory(season, root), exist_ok=True)
+        pages.extend((player_id, season, season_directory(season, root)) for player_id in player_ids)
+
+    print(f"Fetching {len(pages)} pages over {len(season_ids)} seasons...")
+    with get_run().stage(STAGE):
+        await download_pages(pages, backend, concurrent, pool_size, max_in_flight, host_delay, overwrite)
+
+    for season, player_ids in season_ids.items():
+        directory = season_directory(season, root)
+        all_shots = parse_players(player_ids, workers, directory)
+        write_shot_store(all_shots, directory)
+        print(f"{season}: {len(all_shots)} players with shots")
+
+    return write_seasons_index(root)
+
+async def main(concurrent=False, pool_size=POOL_SIZE, max_in_flight=MAX_IN_FLIGHT, host_delay=HOST_DELAY,
+               backend="browser", workers=None, write_json=False, ndjson=None, player_ids=None):
+    """Main function to download and parse shot data (current players unless `player_ids` is given).
+
+    With `ndjson`, players are written to that file (gzipped for .gz) and into
+    the shot store as they are parsed, without holding every player's shots.
+    """
+    if player_ids is None:
+        player_ids = current_player_ids()
 
     # Step 1: Download HTML for each player
-    for player_id in player_ids:
-        await download_shooting_data(browser, player_id)
-    
-    await browser.close()  # Close browser after downloading all files
-
-    # Step 2: Parse HTML files into JSON
-    all_shots = []
-    for player_id in player_ids:
-        shots_data = await parse_shots(player_id)
-        if shots_data:  # Only add if parsing was successful
-            all_shots.append(shots_data)  
-             
-    async with aiofiles.open("shots.json", "w", encoding="utf-8") as f:
-        await f.write(json.dumps(all_shots, indent=2))
-    
+    with get_run().stage(STAGE):
+        await download_players(player_ids, backend, concurrent, pool_size, max_in_flight, host_delay)
+
+    if ndjson:
+        with get_run().stage("parse"), NdjsonWriter(ndjson) as writer:
+            write_shot_store(writer.passthrough(iter_shot_files(player_ids, workers=workers)))
+        print(f"Wrote {writer.count} players to {ndjson}")
+        print("Done!")
+        return
+
+    # Step 2: Parse HTML files across all cores into the columnar shot store
+    all_shots = parse_players(player_ids, workers)
+    write_shot_store(all_shots)
+
+    if write_json:  # legacy output for consumers that still read shots.json
+        async with aiofiles.open("shots.json", "w", encoding="utf-8") as f:
+            await f.write(json.dumps(all_shots, indent=2))
+
     print("Done!")
 
-asyncio.run(main())
+def scrape(refresh_only=False, ttl=REFRESH_TTL, write_json=False, ndjson=None, seasons=None, **options):
+    """Runs main, refresh (`refresh_only`) or backfill (a (first, last) `seasons` range) and saves run metrics.
+
+    `options` are the download settings they share (concurrent, pool_size, backend, ...).
+    """
+    run = set_run(RunMetrics("nba_shot"))
+    try:
+        if seasons:
+            first, last = seasons
+            asyncio.run(backfill(range(first, last + 1), **options))
+        elif refresh_only:
+            asyncio.run(refresh(current_player_ids(), ttl=ttl, **options))
+        else:
+            asyncio.run(main(write_json=write_json, ndjson=ndjson, **options))
+    finally:
+        run.save()
+
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Download and parse player shot charts.")
+    parser.add_argument("--concurrent", action="store_true", help="download players in parallel over a page pool")
+    parser.add_argument("--pages", type=int, default=POOL_SIZE, help="pages kept open on the browser")
+    parser.add_argument("--in-flight", type=int, default=MAX_IN_FLIGHT, help="maximum downloads running at once")
+    parser.add_argument("--host-delay", type=float, default=HOST_DELAY, help="seconds between requests to one host")
+    parser.add_argument("--backend", choices=["browser", "http"], default="browser",
+                        help="fetch pages with headless Chromium or plain HTTP (browser only as fallback)")
+    parser.add_argument("--workers", type=int, default=None, help="parser processes (default: one per core)")
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument("--json", action="store_true", help="also write the legacy shots.json")
+    output.add_argument("--ndjson", metavar="PATH",
+                        help="stream players to PATH (one per line, gzip if .gz) while parsing")
+    parser.add_argument("--refresh", action="store_true",
+                        help="only re-fetch players with new games or pages older than --ttl")
+    parser.add_argument("--ttl", type=float, default=REFRESH_TTL, help="seconds before a page is re-fetched anyway")
+    parser.add_argument("--seasons", type=int, nargs=2, metavar=("FIRST", "LAST"),
+                        help=f"backfill these seasons (end years) into {SEASONS_DIR}/<season>/")
+    args = parser.parse_args()
+    scrape(args.refresh, args.ttl, args.json, args.ndjson, args.seasons, concurrent=args.concurrent,
+           pool_size=args.pages, max_in_flight=args.in_flight, host_delay=args.host_delay, backend=args.backend,
+           workers=args.workers)
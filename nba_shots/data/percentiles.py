@@ -0,0 +1,168 @@
+import argparse
+import json
+import os
+import numpy as np
+import pandas as pd
+from player_registry import load_registry
+from player_resolver import attach_player_ids, load_resolver
+
+STAT_COLUMNS = ['PTS', 'TRB', 'AST', 'FG%', 'FG3%', 'FT%', 'eFG%', 'PER', 'WS']
+RAPPORT_COLUMNS = ['Off', 'Def', 'Tot']
+RAPPORT_FILE = os.path.join('..', '..', 'src', 'rapport_ranking.js')
+PERCENTILES_FILE = 'percentiles.json'
+# Copy bundled with the frontend, which Dashboard passes to PlayerPercentiles
+FRONTEND_FILE = os.path.join('..', '..', 'src', 'percentiles.json')
+
+
+def load_season_stats(filename='season_stats.csv'):
+    """Season stats indexed by player id, with '-' placeholders as NaN."""
+    df = pd.read_csv(filename)
+    df[STAT_COLUMNS + ['G']] = df[STAT_COLUMNS + ['G']].apply(pd.to_numeric, errors='coerce')
+    return df.set_index('Player_id')
+
+
+def load_rapport(filename=RAPPORT_FILE, resolver=None):
+    """Reads Off/Def/Tot from the frontend's rapport_ranking.js, keyed by player id."""
+    with open(filename, 'r', encoding='utf-8') as f:
+        text = f.read()
+    rows = json.loads(text[text.index('['):text.rindex(']') + 1])
+
+    df = pd.DataFrame(rows)[['Player'] + RAPPORT_COLUMNS]
+    for column in RAPPORT_COLUMNS:
+        # values look like "+8.2" / "−1.5" (unicode minus)
+        df[column] = pd.to_numeric(df[column].astype(str).str.replace('−', '-').str.replace('+', ''),
+                                   errors='coerce')
+    attach_player_ids(df, resolver or load_resolver(), 'Player', id_column='Player_id')
+    return df.dropna(subset=['Player_id']).drop_duplicates('Player_id').set_index('Player_id')[RAPPORT_COLUMNS]
+
+
+def position_groups(filename='Player.csv'):
+    """Maps bball_id to a position group: G, F or C (first listed position)."""
+    registry = load_registry(filename)
+    return {player_id: position[:1] if isinstance(position, str) else ''
+            for player_id, position in zip(registry.ids, registry.column('Position'))}
+
+
+class PercentileEngine:
+    """True percentile ranks (0-100) against the league, optionally within position groups.
+
+    Each (group, column) population is kept as a sorted array, so the whole table
+    is a handful of searchsorted calls, and one player's update only touches the
+    arrays that player is in. A rank matches pandas rank(pct=True, method='average').
+    """
+
+    def __init__(self, frame, columns, min_games=0, groups=None):
+        self.columns = list(columns)
+        self.min_games = min_games
+        self.frame = frame[self.columns + (['G'] if 'G' in frame else [])].copy()
+        self.frame['group'] = [groups.get(player_id, '') for player_id in self.frame.index] if groups else ''
+        self.populations = {}
+        for (group, column), values in self.iter_populations():
+            self.populations[(group, column)] = np.sort(values)
+
+    def qualified(self, frame):
+        if 'G' not in frame or not self.min_games:
+            return np.ones(len(frame), dtype=bool)
+        return (frame['G'] >= self.min_games).to_numpy()
+
+    def iter_populations(self):
+        qualified = self.frame[self.qualified(self.frame)]
+        for group, members in qualified.groupby('group'):
+            for column in self.columns:
+                values = members[column].to_numpy(dtype=float)
+                yield (group, column), values[~np.isnan(values)]
+
+    @staticmethod
+    def ranks(population, values):
+        """Average-rank percentile of `values` within a sorted population."""
+        if len(population) == 0:
+            return np.full(len(values), np.nan)
+        below = np.searchsorted(population, values, side='left')
+        through = np.searchsorted(population, values, side='right')
+        pct = (below + (through - below + 1) / 2) / len(population) * 100
+        return np.where(np.isnan(values), np.nan, np.clip(pct, 0, 100))
+
+    def table(self):
+        """Percentiles for every player (qualified or not) against the qualified population."""
+        result = pd.DataFrame(index=self.frame.index, columns=self.columns, dtype=float)
+        for group, members in self.frame.groupby('group'):
+            for column in self.columns:
+                population = self.populations.get((group, column), np.empty(0))
+                result.loc[members.index, column] = self.ranks(population, members[column].to_numpy(dtype=float))
+        return result.round(0)
+
+    def percentile(self, player_id):
+        row = self.frame.loc[player_id]
+        return {
+            column: float(np.round(self.ranks(self.populations.get((row['group'], column), np.empty(0)),
+                                              np.array([row[column]], dtype=float))[0], 0))
+            for column in self.columns
+        }
+
+    def update(self, player_id, stats):
+        """Replaces one player's stats, patching only the sorted arrays they belong to.
+
+        Returns that player's new percentiles; other players shift by at most one
+        rank and are picked up by the next table() call.
+        """
+        if player_id in self.frame.index:
+            old = self.frame.loc[player_id]
+            if self.qualified(self.frame.loc[[player_id]])[0]:
+                for column in self.columns:
+                    if not pd.isna(old[column]):
+                        key = (old['group'], column)
+                        population = self.populations[key]
+                        self.populations[key] = np.delete(population, np.searchsorted(population, old[column]))
+            for column, value in stats.items():
+                self.frame.loc[player_id, column] = value
+        else:
+            self.frame.loc[player_id] = {**stats, 'group': stats.get('group', '')}
+
+        new = self.frame.loc[player_id]
+        if self.qualified(self.frame.loc[[player_id]])[0]:
+            for column in self.columns:
+                if not pd.isna(new[column]):
+                    key = (new['group'], column)
+                    population = self.populations.get(key, np.empty(0))
+                    self.populations[key] = np.insert(population, np.searchsorted(population, new[column]), new[column])
+
+        return self.percentile(player_id)
+
+
+def write_percentiles(table, filename=PERCENTILES_FILE):
+    """Writes {"columns": [...], "players": {id: [pct, ...]}} with nulls for missing stats."""
+    players = {
+        player_id: [None if pd.isna(value) else int(value) for value in row]
+        for player_id, row in zip(table.index, table.to_numpy())
+    }
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump({'columns': list(table.columns), 'players': players}, f, separators=(',', ':'))
+
+
+def main(min_games=0, by_position=False, rapport_file=RAPPORT_FILE, filename=PERCENTILES_FILE,
+         frontend_file=FRONTEND_FILE):
+    stats = load_season_stats()
+    columns = list(STAT_COLUMNS)
+    if rapport_file and os.path.exists(rapport_file):
+        stats = stats.join(load_rapport(rapport_file), how='left')
+        columns += RAPPORT_COLUMNS
+
+    groups = position_groups() if by_position else None
+    engine = PercentileEngine(stats, columns, min_games, groups)
+    table = engine.table()
+    write_percentiles(table, filename)
+    print(f"Wrote percentiles for {len(table)} players ({len(columns)} columns) to {filename}")
+    if frontend_file and os.path.isdir(os.path.dirname(frontend_file) or '.'):
+        write_percentiles(table, frontend_file)
+        print(f"Copied them to {frontend_file}")
+    return engine
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compute league-wide percentile ranks from season stats.')
+    parser.add_argument('--min-games', type=int, default=0, help='games needed to count in the population')
+    parser.add_argument('--by-position', action='store_true', help='rank within G / F / C groups')
+    parser.add_argument('--rapport', default=RAPPORT_FILE, help='rapport_ranking.js for Off/Def/Tot')
+    parser.add_argument('--frontend', default=FRONTEND_FILE, help="copy for the frontend ('' to skip)")
+    args = parser.parse_args()
+    main(args.min_games, args.by_position, args.rapport, frontend_file=args.frontend)
@@ -0,0 +1,208 @@
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+STATE_FILE = "pipeline_state.json"
+JOBS = 4  # stages run at once
+OK = ("ran", "skipped")
+
+
+class Stage:
+    """One step of the data flow: a command plus the files it reads and writes.
+
+    The stage's own script counts as an input, so editing a scraper reruns it.
+    Dependencies are not declared by hand; a stage waits for whichever stages
+    write its inputs.
+    """
+
+    def __init__(self, name, command, inputs=(), outputs=()):
+        self.name = name
+        self.command = list(command)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+
+
+def python(*args):
+    return [sys.executable, *args]
+
+
+def default_stages(sqlite_path=None, shot_args=()):
+    """player.py -> bball_scraper.py -> awards.py / all-nba.py -> db.combine_bio_draft_data -> db.py -> nba_shot.py / percentiles.py -> bundles.py"""
+    load_args = ["--sqlite", sqlite_path] if sqlite_path else []
+    return [
+        Stage("draft", python("player.py"), ["player.py", "Player.csv"], ["nba_draft_data.csv"]),
+        Stage("players", python("bball_scraper.py"), ["bball_scraper.py", "Player.csv"],
+              ["championships.csv", "career_stats.csv", "season_stats.csv", "player_team.csv"]),
+        Stage("awards", python("awards.py"), ["awards.py", "Player.csv"], ["backend/data/Player_awards.csv"]),
+        Stage("all_nba", python("all-nba.py"), ["all-nba.py", "Player.csv"], ["all_nba_final.csv"]),
+        Stage("combine_players", python("-c", "import db; db.combine_bio_draft_data()"),
+              ["db.py", "Player.csv", "player_team.csv"], ["updated_players.csv"]),
+        Stage("load_db", python("db.py", *load_args), ["db.py", "updated_players.csv"]),
+        Stage("shots", python("nba_shot.py", *shot_args), ["nba_shot.py", "shot_parser.py", "updated_players.csv"],
+              ["shots.npy", "shots_index.json"]),
+        Stage("percentiles", python("percentiles.py"), ["percentiles.py", "season_stats.csv", "../../src/rapport_ranking.js"],
+              ["percentiles.json", "../../src/percentiles.json"]),
+        Stage("bundles", python("bundles.py"),
+              ["bundles.py", "query_service.py", "updated_players.csv", "season_stats.csv", "career_stats.csv",
+               "updated_awards_full.csv", "percentiles.json", "shots.npy", "shots_index.json"],
+              ["bundles/index.json"]),
+    ]
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def inputs_hash(stage):
+    """One digest over the command and every input; missing inputs hash as such."""
+    digest = hashlib.sha256(json.dumps(stage.command[1:]).encode())
+    for path in stage.inputs:
+        digest.update(path.encode())
+        digest.update(file_hash(path).encode() if os.path.exists(path) else b"missing")
+    return digest.hexdigest()
+
+
+def load_state(filename=STATE_FILE):
+    if not os.path.exists(filename):
+        return {}
+    with open(filename, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(state, filename=STATE_FILE):
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+
+
+def dependencies(stages):
+    """Maps each stage name to the stages that write one of its inputs."""
+    writers = {}
+    for stage in stages:
+        for path in stage.outputs:
+            writers[path] = stage.name
+    return {
+        stage.name: {writers[path] for path in stage.inputs if path in writers and writers[path] != stage.name}
+        for stage in stages
+    }
+
+
+def up_to_date(stage, digest, state):
+    return state.get(stage.name) == digest and all(os.path.exists(path) for path in stage.outputs)
+
+
+class Pipeline:
+    """Runs stages as subprocesses, as many at once as their dependencies allow."""
+
+    def __init__(self, stages, jobs=JOBS, state_file=STATE_FILE, force=()):
+        self.stages = {stage.name: stage for stage in stages}
+        self.depends = dependencies(stages)
+        self.jobs = jobs
+        self.state_file = state_file
+        self.state = load_state(state_file)
+        self.force = set(force)
+        self.lock = threading.Lock()
+        self.results = {}  # name -> (status, seconds)
+
+    def run_stage(self, stage):
+        digest = inputs_hash(stage)
+        if stage.name not in self.force and "all" not in self.force and up_to_date(stage, digest, self.state):
+            return "skipped", 0.0
+
+        print(f"[{stage.name}] {' '.join(stage.command[1:])}")
+        for path in stage.outputs:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+        start = time.perf_counter()
+        returncode = subprocess.call(stage.command)
+        seconds = time.perf_counter() - start
+        if returncode != 0:
+            return f"failed ({returncode})", seconds
+
+        with self.lock:
+            self.state[stage.name] = digest
+            save_state(self.state, self.state_file)
+        return "ran", seconds
+
+    def run(self, only=None):
+        """Runs every stage (or only the named ones and what they need) and returns the results."""
+        selected = set(self.stages) if not only else self.with_dependencies(only)
+        pending = {name for name in self.stages if name in selected}
+        running = {}
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            while pending or running:
+                for name in sorted(pending):
+                    needs = self.depends[name] & selected
+                    if any(self.results[dep][0] not in OK for dep in needs if dep in self.results):
+                        self.results[name] = ("blocked", 0.0)
+                        pending.discard(name)
+                    elif all(dep in self.results for dep in needs):
+                        running[executor.submit(self.run_stage, self.stages[name])] = name
+                        pending.discard(name)
+
+                if not running:
+                    # Only a dependency cycle leaves stages pending with nothing running
+                    for name in pending:
+                        self.results[name] = ("blocked", 0.0)
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        self.results[name] = future.result()
+                    except Exception as e:
+                        print(f"[{name}] error: {e}")
+                        self.results[name] = ("failed", 0.0)
+
+        self.report(time.perf_counter() - start)
+        return self.results
+
+    def with_dependencies(self, names):
+        selected = set()
+        stack = list(names)
+        while stack:
+            name = stack.pop()
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage: {name}")
+            if name not in selected:
+                selected.add(name)
+                stack.extend(self.depends[name])
+        return selected
+
+    def report(self, total):
+        print(f"\n{'stage':<18}{'status':<14}{'seconds':>9}")
+        for name in self.stages:
+            if name in self.results:
+                status, seconds = self.results[name]
+                print(f"{name:<18}{status:<14}{seconds:>9.1f}")
+        print(f"{'total (wall)':<32}{total:>9.1f}")
+
+
+def main(jobs=JOBS, only=None, force=(), directory=None, sqlite_path=None):
+    # Every script reads and writes relative paths, so stages run from the data directory
+    os.chdir(directory or os.path.dirname(os.path.abspath(__file__)))
+    pipeline = Pipeline(default_stages(sqlite_path), jobs, force=force)
+    results = pipeline.run(only)
+    return all(status in OK for status, _ in results.values())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the scrape -> combine -> load -> shots pipeline.")
+    parser.add_argument("stages", nargs="*", help="stages to run, with what they depend on (default: all)")
+    parser.add_argument("--jobs", type=int, default=JOBS, help="stages run at once")
+    parser.add_argument("--force", nargs="*", default=[], help="rerun these stages even if up to date ('all')")
+    parser.add_argument("--dir", default=None, help="data directory (default: this script's directory)")
+    parser.add_argument("--sqlite", metavar="PATH", help="load into a local SQLite file instead of Supabase")
+    args = parser.parse_args()
+    sys.exit(0 if main(args.jobs, args.stages, args.force, args.dir, args.sqlite) else 1)
@@ -1,111 +1,137 @@
+import argparse
+import csv
+import datetime
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 import pandas as pd
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from bball_scraper import RateLimiter
+from metrics import RunMetrics, get_run, instrumented_get, set_run
+from player_resolver import attach_player_ids, load_resolver
+from table_extractor import extract_table
 
 from string import ascii_lowercase as alp
 
+FIRST_DRAFT_YEAR = 1947
+BIO_COLUMNS = ['Player', 'From', 'To', 'Position', 'Height', 'Weight', 'Birth Date', 'College', 'bball_id']
+DRAFT_COLUMNS = ['Player', 'draft_year', 'draft_round', 'draft_number']
 
 
-def scrape_player_bio():
-    players_data = []
-    for ch in alp:
-        url = f"https://www.basketball-reference.com/players/{ch}/"
-        response = requests.get(url)
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Find the player table
-        table = soup.find('div', id='div_players')
-        
-    
- 
-    # Get all rows from the table body
-        rows = table.find('tbody').find_all('tr')
-    
-    # Extract data from each row
-        for row in rows:
-            player = row.find('th', {'data-stat': 'player'})
-            bball_id = player.get('data-append-csv')
-            year_from = row.find('td', {'data-stat': 'year_min'}).text.strip()
-            year_to = row.find('td', {'data-stat': 'year_max'}).text.strip()
-            position = row.find('td', {'data-stat': 'pos'}).text.strip()
-            height = row.find('td', {'data-stat': 'height'}).text.strip()
-            weight = row.find('td', {'data-stat': 'weight'}).text.strip()
-            birth_date = row.find('td', {'data-stat': 'birth_date'}).text.strip()
-            
-            # Handle college data - some players might not have college info
-            college_td = row.find('td', {'data-stat': 'colleges'})
-            college = college_td.text.strip() if college_td else None
-            
-            # Add data to list
-            players_data.append({
-                'Player': player.text,
-                'From': year_from,
-                'To': year_to,
-                'Position': position,
-                'Height': height,
-                'Weight': weight,
-                'Birth Date': birth_date,
-                'College': college,
-                'bball_id': bball_id
-            })
-        
-        # Create DataFrame
-    df = pd.DataFrame(players_data)
-    df.to_csv('temp_bio.csv')
+def create_session(workers=1):
+    """A keep-alive session whose connection pool fits every worker."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(workers, 1))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def fetch(url, session=None, rate_limiter=None, stage='pages'):
+    if rate_limiter is not None:
+        get_run().record_sleep(stage, rate_limiter.wait())
+    response = instrumented_get((session or requests).get, url, stage)
+    response.raise_for_status()
+    return response
+
+
+def parse_bio_page(content):
+    """Rows of one /players/{letter}/ index page."""
+    players_df = extract_table(
+        content,
+        {'player': 'Player', 'year_min': 'From', 'year_max': 'To', 'pos': 'Position', 'height': 'Height',
+         'weight': 'Weight', 'birth_date': 'Birth Date', 'colleges': 'College'},
+        table_id='players',
+        attributes={'bball_id': ('player', 'data-append-csv')},
+        required=['player', 'year_min'],
+    )
+    return players_df.to_dict('records')
+
+
+def scrape_bio_letter(ch, session=None, rate_limiter=None):
+    url = f"https://www.basketball-reference.com/players/{ch}/"
+    content = fetch(url, session, rate_limiter, 'bios').content
+    with get_run().parsing('bios') as timer:
+        rows = parse_bio_page(content)
+        timer.rows = len(rows)
+    return rows
+
+
+def write_bio_rows(f, rows):
+    """Writes rows in the layout of DataFrame.to_csv: an unnamed index column first."""
+    writer = csv.DictWriter(f, fieldnames=[''] + BIO_COLUMNS)
+    writer.writeheader()
+    for index, row in enumerate(rows):
+        writer.writerow({'': index, **row})
+
+
+def scrape_player_bio(workers=1, filename='temp_bio.csv', requests_per_second=None):
+    """Scrapes the 26 letter index pages over `workers` threads sharing one session.
+
+    Each page's rows are appended to `filename` as soon as it is parsed, in
+    completion order; once every letter is in, the file is rewritten in
+    letter order so the output is the same from run to run.
+    """
+    session = create_session(workers)
+    rate_limiter = RateLimiter(requests_per_second) if requests_per_second else None
+    by_letter = {}
+
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=[''] + BIO_COLUMNS)
+        writer.writeheader()
+        index = 0
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(scrape_bio_letter, ch, session, rate_limiter): ch for ch in alp}
+            for future in as_completed(futures):
+                ch = futures[future]
+                try:
+                    rows = future.result()
+                except Exception as e:
+                    print(f"Error scraping players for letter {ch}: {e}")
+                    continue
+                by_letter[ch] = rows
+                for row in rows:
+                    writer.writerow({'': index, **row})
+                    index += 1
+                f.flush()
+                print(f"Letter {ch}: {len(rows)} players")
+
+    # Rewrite in letter order (page order within a letter) once every letter is in
+    with open(filename + '.tmp', 'w', newline='', encoding='utf-8') as f:
+        write_bio_rows(f, [row for ch in alp if ch in by_letter for row in by_letter[ch]])
+    os.replace(filename + '.tmp', filename)
+
+    df = pd.read_csv(filename, index_col=0)
     print(df)
+    return df
 
-def scrape_draft_data(year):
+def parse_draft_page(text, year):
+    """Rows of one /draft/NBA_{year}.html page."""
+    df = extract_table(text, {'player': 'Player', 'pick_overall': 'draft_number'}, table_id='stats',
+                       required=['player', 'pick_overall'])
+    if df.empty:
+        raise ValueError(f"Could not find the draft data table for year {year}")
+
+    # Forfeited picks have an empty pick number
+    df = df[df['draft_number'] != ''].reset_index(drop=True)
+    df['draft_number'] = df['draft_number'].astype(int)
+    df['draft_year'] = year
+    df['draft_round'] = (df['draft_number'] > 30).astype(int) + 1
+    return df[DRAFT_COLUMNS]
+
+
+def scrape_draft_data(year, session=None, rate_limiter=None):
    
     url = f"https://www.basketball-reference.com/draft/NBA_{year}.html"
 
     
     try:
         # Send request to the URL
-        response = requests.get(url)
-        response.raise_for_status()
-        
-        # Create BeautifulSoup object
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Find the table containing draft data
-        table = soup.find('table', {'id': 'stats'})
-        if not table:
-            raise ValueError(f"Could not find the draft data table for year {year}")
-            
-        # Initialize lists to store data
-        player_names = []
-        draft_years = []
-        draft_rounds = []
-        draft_numbers = []
-        
-        # Process each row in the table
-        rows = table.find('tbody').find_all('tr')
-        for row in rows:
-            # Extract player name
-            player_cell = row.find('td', {'data-stat': 'player'})
-            if player_cell:
-                player_names.append(player_cell.text.strip())
-            
-            # Extract draft number (pick overall)
-            pick_cell = row.find('td', {'data-stat': 'pick_overall'})
-            if pick_cell and pick_cell.text:
-                pick_number = int(pick_cell.text)
-                draft_numbers.append(pick_number)
-                draft_rounds.append(1 if pick_number <= 30 else 2)
-                draft_years.append(year)
-        
-        # Ensure all lists have the same length
-        min_length = min(len(player_names), len(draft_years), len(draft_rounds), len(draft_numbers))
-        
-        # Create DataFrame
-        df = pd.DataFrame({
-            'Player': player_names[:min_length],
-            'draft_year': draft_years[:min_length],
-            'draft_round': draft_rounds[:min_length],
-            'draft_number': draft_numbers[:min_length]
-        })
+        response = fetch(url, session, rate_limiter, 'draft')
         
+        with get_run().parsing('draft') as timer:
+            df = parse_draft_page(response.text, year)
+            timer.rows = len(df)
         return df
         
     except requests.exceptions.RequestException as e:
@@ -116,19 +142,76 @@ def scrape_draft_data(year):
         return None
 
 #this function gets called then saved to a csv. 
-def get_all_draft_data(start_year=1955, end_year=1959):
-   
+def get_all_draft_data(start_year=1955, end_year=1959, resolver=None, workers=1, filename=None,
+                       requests_per_second=None):
+    """Scrapes draft years over `workers` threads sharing one session.
+
+    With `filename`, each year's rows are appended as soon as that page is parsed.
+    """
+    session = create_session(workers)
+    rate_limiter = RateLimiter(requests_per_second) if requests_per_second else None
     all_data = []
-    
-    for year in range(start_year, end_year + 1):
-        print(f"Scraping data for year {year}...")
-        df = scrape_draft_data(year)
-        if df is not None:
-            all_data.append(df)
+
+    out = open(filename, 'w', newline='', encoding='utf-8') if filename else None
+    try:
+        writer = csv.DictWriter(out, fieldnames=DRAFT_COLUMNS) if out else None
+        if writer:
+            writer.writeheader()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(scrape_draft_data, year, session, rate_limiter): year
+                       for year in range(start_year, end_year + 1)}
+            for future in as_completed(futures):
+                df = future.result()
+                print(f"Scraped draft data for year {futures[future]}")
+                if df is not None:
+                    all_data.append(df)
+                    if writer:
+                        writer.writerows(df.to_dict('records'))
+                        out.flush()
+    finally:
+        if out:
+            out.close()
     
     if all_data:
         combined_df = pd.concat(all_data, ignore_index=True)
+        combined_df = combined_df.sort_values(['draft_year', 'draft_number'], ignore_index=True)
+        if resolver is not None:
+            # Rookies debut the season after the draft
+            combined_df['debut_season'] = combined_df['draft_year'] + 1
+            attach_player_ids(combined_df, resolver, 'Player', 'debut_season')
+            combined_df = combined_df.drop(columns=['debut_season'])
         return combined_df
     return None
 
 
+def main(workers=1, start_year=FIRST_DRAFT_YEAR, end_year=None, requests_per_second=None, bios=False, draft=True):
+    end_year = end_year or datetime.date.today().year
+    run = set_run(RunMetrics('player'))
+    try:
+        if bios:
+            with run.stage('bios'):
+                scrape_player_bio(workers, requests_per_second=requests_per_second)
+        if not draft:
+            return None
+        # Draft picks get their bball_id from the player list, when there is one yet
+        resolver = load_resolver('Player.csv') if os.path.exists('Player.csv') else None
+        with run.stage('draft'):
+            df = get_all_draft_data(start_year, end_year, resolver, workers=workers, filename='nba_draft_data.csv',
+                                    requests_per_second=requests_per_second)
+        if df is not None:
+            # Rewrite in draft order once every year is in
+            df.to_csv('nba_draft_data.csv', index=False)
+        return df
+    finally:
+        run.save()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape player bios and draft history from Basketball-Reference.")
+    parser.add_argument("--workers", type=int, default=1, help="pages fetched concurrently")
+    parser.add_argument("--start", type=int, default=FIRST_DRAFT_YEAR, help="first draft year")
+    parser.add_argument("--end", type=int, default=None, help="last draft year (default: this year)")
+    parser.add_argument("--rate", type=float, default=None, help="requests per second shared by all workers")
+    parser.add_argument("--bios", action="store_true", help="also scrape the letter index pages to temp_bio.csv")
+    args = parser.parse_args()
+    main(args.workers, args.start, args.end, args.rate, args.bios)
@@ -0,0 +1,119 @@
+import os
+import pickle
+import numpy as np
+import pandas as pd
+from player_resolver import PlayerResolver, season_end_year
+
+MISSING_YEAR = 0  # stored in the year arrays when From/To is unknown
+REGISTRY_VERSION = 3  # bump when the registry's layout changes, so cached registries are rebuilt
+
+
+def registry_cache(players_csv):
+    """'updated_players.csv' -> 'updated_players.registry.pkl', next to the CSV."""
+    return os.path.splitext(players_csv)[0] + ".registry.pkl"
+
+
+class PlayerRegistry:
+    """Every player row keyed by bball_id, stored as one array per column.
+
+    Player.csv calls the id column bball_id and updated_players.csv calls it
+    player_id; both are read as bball_id. A player listed more than once keeps
+    only their last row, where it stands in the file: the CSVs are appended to
+    and merged, so later rows are the newer ones (updated_players.csv repeats
+    some players with 'Unknown' before their real team). From/To are also kept
+    as int16 season end years so season filters are a single vectorized
+    comparison. The name resolver is built from the same rows, so the two
+    always agree on who exists.
+    """
+
+    def __init__(self, columns):
+        # columns: {name: array}, all the same length, including bball_id
+        self.version = REGISTRY_VERSION  # saved with the pickle, unlike a class attribute
+        self.columns = {name: np.asarray(values) for name, values in columns.items()}
+        if 'bball_id' not in self.columns and 'player_id' in self.columns:
+            self.columns['bball_id'] = self.columns.pop('player_id')
+
+        # Last row per id, in file order; rows without an id are kept but cannot be looked up
+        last = {}
+        for i, player_id in enumerate(self.columns['bball_id'].tolist()):
+            last[player_id if isinstance(player_id, str) else ('__row', i)] = i
+        if len(last) < len(self.columns['bball_id']):
+            rows = np.sort(np.fromiter(last.values(), dtype=np.intp, count=len(last)))
+            self.columns = {name: values[rows] for name, values in self.columns.items()}
+
+        self.ids = self.columns['bball_id'].tolist()
+        self.index = {player_id: i for i, player_id in enumerate(self.ids) if isinstance(player_id, str)}
+        self.year_from = self.years('From')
+        self.year_to = self.years('To')
+        self.resolver = PlayerResolver(zip(self.column('Player'), self.column('From'), self.column('To'), self.ids))
+
+    def years(self, column):
+        if column not in self.columns:
+            return np.full(len(self.ids), MISSING_YEAR, dtype=np.int16)
+        return np.array([season_end_year(value) or MISSING_YEAR for value in self.columns[column].tolist()],
+                        dtype=np.int16)
+
+    @classmethod
+    def from_csv(cls, filename="Player.csv"):
+        df = pd.read_csv(filename)
+        return cls({column: df[column].to_numpy() for column in df.columns})
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, player_id):
+        return player_id in self.index
+
+    def column(self, name, ids=None):
+        """One column as a list, for every player or just `ids`."""
+        values = self.columns[name]
+        if ids is None:
+            return values.tolist()
+        return values[[self.index[player_id] for player_id in ids]].tolist()
+
+    def row(self, player_id):
+        """{column: value} for one player, or None for an unknown id."""
+        i = self.index.get(player_id)
+        if i is None:
+            return None
+        return {name: values[i] for name, values in self.columns.items()}
+
+    def last_years(self, ids=None):
+        """Season end year of each player's last season (None when unknown)."""
+        years = self.year_to if ids is None else self.year_to[[self.index[player_id] for player_id in ids]]
+        return [year or None for year in years.tolist()]
+
+    def active_in(self, season):
+        """Ids of players whose career spans `season` ('2024-25' or 2025)."""
+        year = season_end_year(season)
+        active = (self.year_from <= year) & (year <= self.year_to) & (self.year_from != MISSING_YEAR)
+        return [self.ids[i] for i in np.flatnonzero(active)]
+
+    def last_played_in(self, season):
+        """Ids of players whose final season so far is `season`."""
+        return [self.ids[i] for i in np.flatnonzero(self.year_to == season_end_year(season))]
+
+    def frame(self, ids=None):
+        """The rows as a DataFrame with the CSV's columns, for every player or just `ids`."""
+        if ids is None:
+            return pd.DataFrame(self.columns)
+        rows = [self.index[player_id] for player_id in ids]
+        return pd.DataFrame({name: values[rows] for name, values in self.columns.items()})
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_registry(players_csv="Player.csv", cache=None):
+    """Loads the registry from its binary cache, rebuilding it when the CSV is newer."""
+    cache = cache or registry_cache(players_csv)
+    if os.path.exists(cache) and os.path.getmtime(cache) >= os.path.getmtime(players_csv):
+        with open(cache, "rb") as f:
+            registry = pickle.load(f)
+        if getattr(registry, "version", None) == REGISTRY_VERSION:
+            return registry
+
+    registry = PlayerRegistry.from_csv(players_csv)
+    registry.save(cache)
+    return registry
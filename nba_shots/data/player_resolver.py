@@ -0,0 +1,136 @@
+import re
+import unicodedata
+from collections import defaultdict
+import pandas as pd
+
+FUZZY_THRESHOLD = 0.6  # minimum trigram Dice similarity for a fuzzy match
+
+SUFFIXES = {"jr", "sr", "ii", "iii", "iv"}
+
+
+def normalize_name(name):
+    """'Nikola Jokić' -> 'nikola jokic', 'Dolph Schayes* ' -> 'dolph schayes', 'Gary Payton II' -> 'gary payton'."""
+    if not isinstance(name, str):
+        return ""
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(ch for ch in name if not unicodedata.combining(ch))
+    name = re.sub(r"[^a-z\s-]", "", name.lower()).replace("-", " ")
+    words = [word for word in name.split() if word not in SUFFIXES]
+    return " ".join(words)
+
+
+def season_end_year(season):
+    """'1998-99' -> 1999, '1999-00' -> 2000, 2025 -> 2025; None when unknown."""
+    if season is None or (isinstance(season, float) and pd.isna(season)):
+        return None
+    if isinstance(season, (int, float)):
+        return int(season)
+    match = re.match(r"\s*(\d{4})(?:-(\d{2}))?", str(season))
+    if not match:
+        return None
+    start = int(match.group(1))
+    return start + 1 if match.group(2) else start
+
+
+def trigrams(name):
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class PlayerResolver:
+    """Maps player names (plus optional season) to bball_id.
+
+    Exact lookups go through a dict keyed by normalized name; misses fall back
+    to a trigram inverted index. When several players share a name the one
+    active in the given season wins, otherwise the most recent career.
+    """
+
+    def __init__(self, players):
+        # players: iterable of (name, from_year, to_year, bball_id)
+        self.ids = []
+        self.years = []
+        self.names = []
+        self.gram_counts = []
+        self.exact = defaultdict(list)
+        self.grams = defaultdict(set)
+
+        for name, year_from, year_to, bball_id in players:
+            if not isinstance(bball_id, str):
+                continue
+            i = len(self.ids)
+            normalized = normalize_name(name)
+            self.ids.append(bball_id)
+            self.years.append((season_end_year(year_from), season_end_year(year_to)))
+            self.names.append(normalized)
+            self.exact[normalized].append(i)
+            grams = trigrams(normalized)
+            self.gram_counts.append(len(grams))
+            for gram in grams:
+                self.grams[gram].add(i)
+
+        self.exact = dict(self.exact)
+        self.grams = dict(self.grams)
+
+    def pick(self, candidates, season):
+        if len(candidates) == 1:
+            return candidates[0]
+        year = season_end_year(season)
+        if year is not None:
+            active = [i for i in candidates
+                      if self.years[i][0] is not None and self.years[i][0] <= year <= (self.years[i][1] or year)]
+            if active:
+                candidates = active
+        return max(candidates, key=lambda i: self.years[i][1] or 0)
+
+    def fuzzy(self, normalized):
+        grams = trigrams(normalized)
+        counts = defaultdict(int)
+        for gram in grams:
+            for i in self.grams.get(gram, ()):
+                counts[i] += 1
+
+        best, best_score = [], FUZZY_THRESHOLD
+        for i, shared in counts.items():
+            score = 2 * shared / (len(grams) + self.gram_counts[i])
+            if score > best_score:
+                best, best_score = [i], score
+            elif score == best_score:
+                best.append(i)
+        return best
+
+    def resolve(self, name, season=None):
+        """Returns the bball_id for `name`, or None when nothing is close enough."""
+        normalized = normalize_name(name)
+        if not normalized:
+            return None
+        candidates = self.exact.get(normalized) or self.fuzzy(normalized)
+        if not candidates:
+            return None
+        return self.ids[self.pick(candidates, season)]
+
+    def resolve_many(self, names, seasons=None):
+        """Resolves a column of names, looking up each distinct (name, season) pair once."""
+        seasons = [None] * len(names) if seasons is None else list(seasons)
+        cache = {}
+        ids = []
+        for name, season in zip(names, seasons):
+            key = (name, season)
+            if key not in cache:
+                cache[key] = self.resolve(name, season)
+            ids.append(cache[key])
+        return ids
+
+
+
+def load_resolver(players_csv="Player.csv"):
+    """The resolver of the player registry, loaded from the registry's cache when up to date."""
+    from player_registry import load_registry  # the registry module imports this one
+
+    return load_registry(players_csv).resolver
+
+
+def attach_player_ids(df, resolver, name_column="Player", season_column=None, id_column="bball_id"):
+    """Adds a bball_id column resolved from names (and seasons, when given)."""
+    seasons = df[season_column].tolist() if season_column else None
+    df[id_column] = resolver.resolve_many(df[name_column].tolist(), seasons)
+    return df
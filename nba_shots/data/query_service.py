@@ -0,0 +1,344 @@
+import argparse
+import asyncio
+import functools
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from email.utils import formatdate
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlparse
+import pandas as pd
+from bulk_load import frame_to_records
+from db import AWARD_COLUMNS, PLAYER_COLUMNS, STAT_COLUMNS
+from percentiles import PERCENTILES_FILE
+from player_registry import load_registry
+from shot_store import INDEX_FILE, ShotStore
+
+CACHE_SIZE = 2048  # rendered responses kept in memory
+GZIP_MIN_BYTES = 1024  # smaller bodies are sent uncompressed
+GZIP_LEVEL = 5  # cheaper than the default 9; cache misses pay for compression inline
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 500
+PORT = 8000
+MAX_HEADER_BYTES = 65536  # requests with a longer header block are refused
+
+# Sent with every response, including 304s
+COMMON_HEADERS = ('Vary: Accept-Encoding\r\n'
+                  'Cache-Control: no-cache\r\n'  # always revalidate with the ETag
+                  'Access-Control-Allow-Origin: *\r\n'
+                  'Access-Control-Expose-Headers: ETag, X-Total-Count, X-Page, X-Page-Size\r\n')
+
+# Query parameter aliases used by the frontend (PlayerList passes name/team/position)
+FILTER_ALIASES = {'name': 'player'}
+
+
+def to_json(value):
+    return json.dumps(value, separators=(',', ':'), default=lambda o: o.item() if hasattr(o, 'item') else str(o))
+
+
+class PlayerData:
+    """Read-only view over the locally built CSVs, shot store and percentile table.
+
+    Records use the same column names as the database tables (see db.py), so
+    responses match what the frontend reads from the hosted API.
+    """
+
+    def __init__(self, directory='.'):
+        self.directory = directory
+        path = lambda name: os.path.join(directory, name)
+
+        players = load_registry(path('updated_players.csv')).frame()
+        players['birth_date'] = pd.to_datetime(players['Birth Date'], errors='coerce').dt.strftime('%Y-%m-%d')
+        self.players = frame_to_records(players, PLAYER_COLUMNS)
+        self.by_id = {player['player_id']: player for player in self.players}
+
+        # Lower-cased string columns for substring filters
+        self.search = pd.DataFrame(self.players).astype(str).apply(lambda column: column.str.lower())
+
+        self.season_stats = self.load_stats(path('season_stats.csv'))
+        self.career_stats = self.load_stats(path('career_stats.csv'))
+        self.season_list = list(self.season_stats.values())
+
+        self.awards = {}
+        if os.path.exists(path('updated_awards_full.csv')):
+            awards = pd.read_csv(path('updated_awards_full.csv'))
+            awards['Season'] = awards['Season'].astype(str)
+            for award in frame_to_records(awards.dropna(subset=['bball_id']), AWARD_COLUMNS):
+                self.awards.setdefault(award['player_id'], []).append(award)
+
+        self.shots = ShotStore(directory) if os.path.exists(path(INDEX_FILE)) else None
+
+        self.percentiles = {}
+        if os.path.exists(path(PERCENTILES_FILE)):
+            with open(path(PERCENTILES_FILE), 'r', encoding='utf-8') as f:
+                table = json.load(f)
+            self.percentiles = {player_id: dict(zip(table['columns'], values))
+                                for player_id, values in table['players'].items()}
+
+    @staticmethod
+    def load_stats(filename):
+        if not os.path.exists(filename):
+            return {}
+        records = frame_to_records(pd.read_csv(filename), STAT_COLUMNS)
+        return {record['player_id']: record for record in records}
+
+    def list_players(self, filters, page=None, page_size=PAGE_SIZE):
+        """Players whose columns contain every filter value (case-insensitive).
+
+        Returns (players, total matches); without `page` every match is returned.
+        """
+        mask = None
+        for column, value in filters.items():
+            column = FILTER_ALIASES.get(column, column)
+            if not value or column not in self.search:
+                continue
+            match = self.search[column].str.contains(value.lower(), regex=False).to_numpy()
+            mask = match if mask is None else mask & match
+
+        players = self.players if mask is None else [p for p, keep in zip(self.players, mask) if keep]
+        total = len(players)
+        if page is not None:
+            start = (page - 1) * page_size
+            players = players[start:start + page_size]
+        return players, total
+
+    def player_detail(self, player_id, shots=True):
+        """The /player/{id} payload, or None for an unknown id; `shots=False` leaves shot_data empty."""
+        player = self.by_id.get(player_id)
+        if player is None:
+            return None
+        return {
+            'player': player,
+            'stats': self.season_stats.get(player_id, {}),
+            'career_stats': self.career_stats.get(player_id, {}),
+            'awards': self.awards.get(player_id, []),
+            'percentiles': self.percentiles.get(player_id, {}),
+            'shot_data': self.shots.player_shots(player_id) if shots and self.shots is not None else [],
+        }
+
+
+class Rendered:
+    """A response body with its ETag, a gzipped copy and their header blocks, built once and cached.
+
+    The header blocks are everything after the status and Date lines, so
+    sending a cached response is a join and a write.
+    """
+
+    __slots__ = ('status', 'body', 'gzipped', 'etag', 'headers', 'head', 'gzip_head', 'not_modified_head')
+
+    def __init__(self, status, payload, headers=None):
+        self.status = status
+        self.body = to_json(payload).encode('utf-8')
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest() + '"'
+        self.gzipped = gzip.compress(self.body, GZIP_LEVEL) if len(self.body) >= GZIP_MIN_BYTES else None
+        self.headers = headers or {}
+
+        self.head = self.header_block(len(self.body))
+        self.gzip_head = None if self.gzipped is None else self.header_block(len(self.gzipped), gzip=True)
+        self.not_modified_head = f'ETag: {self.etag}\r\nContent-Length: 0\r\n{COMMON_HEADERS}'.encode('latin-1')
+
+    def header_block(self, length, gzip=False):
+        lines = [f'Content-Type: application/json\r\nContent-Length: {length}\r\nETag: {self.etag}\r\n']
+        if gzip:
+            lines.append('Content-Encoding: gzip\r\n')
+        lines.extend(f'{name}: {value}\r\n' for name, value in self.headers.items())
+        lines.append(COMMON_HEADERS)
+        return ''.join(lines).encode('latin-1')
+
+
+class LRUCache:
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build):
+        with self.lock:
+            if key in self.items:
+                self.items.move_to_end(key)
+                self.hits += 1
+                return self.items[key]
+            self.misses += 1
+        value = build()  # built outside the lock; a racing build just overwrites
+        with self.lock:
+            self.items[key] = value
+            self.items.move_to_end(key)
+            while len(self.items) > self.size:
+                self.items.popitem(last=False)
+        return value
+
+
+class QueryService:
+    """Routes /players, /player/{id} and /season_stats to rendered, cached responses.
+
+    Every /player/{id} response is rendered (JSON, gzip, ETag) up front, so
+    detail requests never build shot lists or compress while serving; the
+    LRU cache covers the open-ended /players filters and pages.
+    """
+
+    def __init__(self, data, cache_size=CACHE_SIZE):
+        self.data = data
+        self.cache = LRUCache(cache_size)
+        self.details = {player_id: Rendered(200, data.player_detail(player_id)) for player_id in data.by_id}
+
+    def render(self, path, query):
+        parts = [part for part in path.split('/') if part]
+        if parts == ['players']:
+            return self.render_players(query)
+        if len(parts) == 2 and parts[0] == 'player':
+            if parts[1] not in self.details:
+                return Rendered(404, {'error': f'Unknown player: {parts[1]}'})
+            return self.details[parts[1]]
+        if parts == ['season_stats']:
+            return Rendered(200, self.data.season_list)
+        return Rendered(404, {'error': f'Not found: {path}'})
+
+    def render_players(self, query):
+        params = {key: values[-1] for key, values in parse_qs(query).items()}
+        try:
+            page = int(params.pop('page')) if 'page' in params else None
+            page_size = min(int(params.pop('page_size', PAGE_SIZE)), MAX_PAGE_SIZE)
+        except ValueError:
+            return Rendered(400, {'error': 'page and page_size must be integers'})
+        if page is not None and (page < 1 or page_size < 1):
+            return Rendered(400, {'error': 'page and page_size must be positive'})
+
+        # The body stays a bare list, as the frontend expects; totals go in headers
+        players, total = self.data.list_players(params, page, page_size)
+        headers = {'X-Total-Count': str(total)}
+        if page is not None:
+            headers['X-Page'] = str(page)
+            headers['X-Page-Size'] = str(page_size)
+        return Rendered(200, players, headers)
+
+    def get(self, target):
+        url = urlparse(target)
+        prefix, _, player_id = url.path.rpartition('/')
+        if prefix == '/player' and player_id in self.details:
+            return self.details[player_id]
+        # Sorted query keeps equivalent URLs on one cache entry
+        query = '&'.join(sorted(url.query.split('&'))) if url.query else ''
+        return self.cache.get((url.path, query), lambda: self.render(url.path, query))
+
+
+@functools.lru_cache(maxsize=1)
+def date_header(second):
+    return f'Date: {formatdate(second, usegmt=True)}\r\n'.encode('latin-1')
+
+
+@functools.cache
+def status_line(status):
+    return f'HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n'.encode('latin-1')
+
+
+class HttpProtocol(asyncio.Protocol):
+    """HTTP/1.1 GET with keep-alive and pipelining, one event loop for every connection.
+
+    Responses are prebuilt Rendered objects, so serving one is a header
+    parse, a dict lookup and a write; there are no per-request threads to
+    contend for the GIL.
+    """
+
+    def __init__(self, service, verbose=False):
+        self.service = service
+        self.verbose = verbose
+        self.transport = None
+        self.buffer = b''
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def connection_lost(self, exc):
+        self.transport = None
+
+    def data_received(self, data):
+        self.buffer += data
+        while self.transport is not None:
+            end = self.buffer.find(b'\r\n\r\n')
+            if end < 0:
+                if len(self.buffer) > MAX_HEADER_BYTES:
+                    self.refuse(431)
+                return
+            head, self.buffer = self.buffer[:end].decode('latin-1'), self.buffer[end + 4:]
+            self.handle(head)
+
+    def handle(self, head):
+        lines = head.split('\r\n')
+        request = lines[0].split()
+        if len(request) != 3:
+            return self.refuse(400)
+        method, target, version = request
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        if method != 'GET':
+            return self.refuse(501)
+        if headers.get('content-length', '0') != '0' or 'transfer-encoding' in headers:
+            return self.refuse(400)  # GET bodies are not read, so the connection could not be reused
+
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+        response = self.service.get(target)
+        if response.status == 200 and headers.get('if-none-match') == response.etag:
+            status, head, body = 304, response.not_modified_head, b''
+        elif response.gzipped is not None and 'gzip' in headers.get('accept-encoding', ''):
+            status, head, body = response.status, response.gzip_head, response.gzipped
+        else:
+            status, head, body = response.status, response.head, response.body
+
+        self.transport.writelines((status_line(status), date_header(int(time.time())), head,
+                                   b'' if keep_alive else b'Connection: close\r\n', b'\r\n', body))
+        if self.verbose:
+            print(f'{self.transport.get_extra_info("peername")[0]} "{lines[0]}" {status} {len(body)}',
+                  file=sys.stderr)
+        if not keep_alive:
+            self.close()
+
+    def refuse(self, status):
+        self.transport.writelines((status_line(status), date_header(int(time.time())),
+                                   b'Content-Length: 0\r\nConnection: close\r\n\r\n'))
+        self.close()
+
+    def close(self):
+        self.transport.close()
+        self.transport = None
+        self.buffer = b''
+
+
+async def serve(service, host='127.0.0.1', port=PORT, verbose=False):
+    loop = asyncio.get_running_loop()
+    server = await loop.create_server(lambda: HttpProtocol(service, verbose), host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def main(directory='.', host='127.0.0.1', port=PORT, cache_size=CACHE_SIZE, verbose=False):
+    data = PlayerData(directory)
+    start = time.perf_counter()
+    service = QueryService(data, cache_size)
+    print(f"Rendered {len(service.details)} player responses in {time.perf_counter() - start:.1f}s")
+    print(f"Serving {len(data.players)} players on http://{host}:{port} (shots: {data.shots is not None})")
+    try:
+        asyncio.run(serve(service, host, port, verbose))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve player, stats and shot data from the local stores.')
+    parser.add_argument('--dir', default='.', help='directory with updated_players.csv, stats CSVs and shots.npy')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--cache', type=int, default=CACHE_SIZE, help='responses kept in the LRU cache')
+    parser.add_argument('--verbose', action='store_true', help='log every request')
+    args = parser.parse_args()
+    main(args.dir, args.host, args.port, args.cache, args.verbose)
@@ -0,0 +1,101 @@
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import lxml.etree
+import lxml.html
+
+# Direct child <div>s of any element whose class list includes shot-area (CSS ".shot-area > div")
+SHOT_DIVS = lxml.etree.XPath('//*[contains(concat(" ", normalize-space(@class), " "), " shot-area ")]/div')
+HTML_PARSER = lxml.html.HTMLParser(encoding="utf-8")
+LEFT = re.compile(r'left:\s*(-?\d+)\s*px')
+TOP = re.compile(r'top:\s*(-?\d+)\s*px')
+
+
+def parse_shots_html(html):
+    """Extracts {"x", "y", "madeShot", "shotPts"} records from a shooting page.
+
+    libxml2 builds the tree in C, so comments, unquoted attributes and stray
+    markup are handled like a browser would, at a fraction of BeautifulSoup's cost.
+    """
+    try:
+        root = lxml.html.fromstring(html.encode("utf-8"), parser=HTML_PARSER)
+    except lxml.etree.ParserError:  # empty document
+        return []
+
+    shots = []
+    for div in SHOT_DIVS(root):
+        style = div.get("style", "")
+        left = LEFT.search(style)
+        top = TOP.search(style)
+        if not left or not top:
+            continue
+
+        made_shot = "make" in div.get("class", "").split()
+        shot_pts = 3 if "3-pointer" in div.get("tip", "") else 2
+
+        shots.append({"x": int(left.group(1)), "y": int(top.group(1)), "madeShot": made_shot, "shotPts": shot_pts})
+
+    return shots
+
+
+def parse_shots_soup(html):
+    """The original BeautifulSoup parser, kept as the reference parse_shots_html must match."""
+    from bs4 import BeautifulSoup
+
+    shots = []
+    for div in BeautifulSoup(html, "html.parser").select(".shot-area > div"):
+        style = div.get("style", "")
+        try:
+            x = int(style.split("left:")[1].split("px")[0].strip())
+            y = int(style.split("top:")[1].split("px")[0].strip())
+        except (IndexError, ValueError):
+            continue
+        made_shot = "make" in div.get("class", [])
+        shot_pts = 3 if "3-pointer" in div.get("tip", "") else 2
+        shots.append({"x": x, "y": y, "madeShot": made_shot, "shotPts": shot_pts})
+
+    return shots
+
+
+def parse_shot_file(player_id, directory="."):
+    """Parses shots_<id>.html; returns {"playerId", "shots"} or None."""
+    html_filename = os.path.join(directory, f"shots_{player_id}.html")
+
+    if not os.path.exists(html_filename):
+        return None
+
+    with open(html_filename, "r", encoding="utf-8") as f:
+        shots = parse_shots_html(f.read())
+
+    return {"playerId": player_id, "shots": shots} if shots else None
+
+
+def parse_shot_files(player_ids, directory=".", workers=None, chunksize=16):
+    """Parses every player's HTML file across a process pool, keeping input order."""
+    player_ids = list(player_ids)
+    directories = [directory] * len(player_ids)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(parse_shot_file, player_ids, directories, chunksize=chunksize)
+        return [shots_data for shots_data in results if shots_data]
+
+
+def iter_shot_files(player_ids, directory=".", workers=None, window=64):
+    """Like parse_shot_files, but yields players in order as they are parsed.
+
+    At most `window` pages are queued or held at once, so memory stays flat
+    however many players there are.
+    """
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for player_id in player_ids:
+            pending.append(executor.submit(parse_shot_file, player_id, directory))
+            if len(pending) >= window:
+                shots_data = pending.popleft().result()
+                if shots_data:
+                    yield shots_data
+        while pending:
+            shots_data = pending.popleft().result()
+            if shots_data:
+                yield shots_data
@@ -0,0 +1,190 @@
+import json
+import os
+import shutil
+import numpy as np
+
+# One record per shot; 6 bytes instead of a JSON object
+SHOT_DTYPE = np.dtype([("x", "<i2"), ("y", "<i2"), ("made", "?"), ("pts", "u1")])
+
+SHOTS_FILE = "shots.npy"
+INDEX_FILE = "shots_index.json"
+# Multi-season history: one store per season under SEASONS_DIR/<season>/, plus a player -> seasons index
+SEASONS_DIR = "shot_seasons"
+SEASONS_INDEX = "seasons_index.json"
+
+
+def shots_to_records(shots):
+    """Packs one player's [{"x", "y", "madeShot", "shotPts"}, ...] into SHOT_DTYPE records."""
+    records = np.empty(len(shots), dtype=SHOT_DTYPE)
+    records["x"] = [shot["x"] for shot in shots]
+    records["y"] = [shot["y"] for shot in shots]
+    records["made"] = [shot["madeShot"] for shot in shots]
+    records["pts"] = [shot["shotPts"] for shot in shots]
+    return records
+
+
+class ShotStoreWriter:
+    """Builds the store one player at a time, holding only the offsets in memory.
+
+    Records are appended to a scratch file as players arrive; close() writes
+    the .npy header, copies the records behind it and swaps the new store in.
+    A player added twice keeps the later records.
+    """
+
+    def __init__(self, directory="."):
+        self.directory = directory
+        self.path = os.path.join(directory, SHOTS_FILE)
+        self.data = open(self.path + ".part", "wb")
+        self.index = {}
+        self.count = 0
+
+    def add(self, player_id, records):
+        self.data.write(np.ascontiguousarray(records, dtype=SHOT_DTYPE).tobytes())
+        self.index[player_id] = [self.count, self.count + len(records)]
+        self.count += len(records)
+
+    def close(self):
+        self.data.close()
+        header = {"descr": np.lib.format.dtype_to_descr(SHOT_DTYPE), "fortran_order": False, "shape": (self.count,)}
+        with open(self.path + ".tmp", "wb") as out, open(self.path + ".part", "rb") as data:
+            np.lib.format.write_array_header_1_0(out, header)
+            shutil.copyfileobj(data, out)
+        os.replace(self.path + ".tmp", self.path)
+        os.remove(self.path + ".part")
+        with open(os.path.join(self.directory, INDEX_FILE), "w", encoding="utf-8") as f:
+            json.dump(self.index, f)
+        return self.index
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:  # leave the existing store untouched
+            self.data.close()
+            os.remove(self.path + ".part")
+
+
+def write_blocks(blocks, directory="."):
+    """Writes {player_id: records} as one structured array plus per-player offsets."""
+    with ShotStoreWriter(directory) as writer:
+        for player_id, block in blocks.items():
+            writer.add(player_id, block)
+    return writer.index
+
+
+def write_shot_store(all_shots, directory="."):
+    """Writes [{"playerId", "shots"}, ...] as one structured array plus per-player offsets.
+
+    `all_shots` may be a generator; each player is written as it arrives, so
+    memory does not grow with the number of players.
+    """
+    with ShotStoreWriter(directory) as writer:
+        for player in all_shots:
+            writer.add(player["playerId"], shots_to_records(player["shots"]))
+    return writer.index
+
+
+def update_shot_store(all_shots, player_ids, directory="."):
+    """Replaces the shots of `player_ids` with the parsed `all_shots`, keeping every other player.
+
+    Players in `player_ids` without parsed shots are dropped from the store.
+    Kept players are copied straight from the current store's memory map.
+    """
+    replaced = set(player_ids)
+    with ShotStoreWriter(directory) as writer:
+        if os.path.exists(os.path.join(directory, INDEX_FILE)):
+            store = ShotStore(directory)
+            for player_id in store.player_ids():
+                if player_id not in replaced:
+                    writer.add(player_id, store.player_array(player_id))
+            del store  # release the memory map before the file is replaced
+        for player in all_shots:
+            writer.add(player["playerId"], shots_to_records(player["shots"]))
+    return writer.index
+
+
+class ShotStore:
+    """Memory-mapped reader for the columnar shot store."""
+
+    def __init__(self, directory="."):
+        self.records = np.load(os.path.join(directory, SHOTS_FILE), mmap_mode="r")
+        with open(os.path.join(directory, INDEX_FILE), "r", encoding="utf-8") as f:
+            self.index = json.load(f)
+
+    def __contains__(self, player_id):
+        return player_id in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def player_ids(self):
+        return list(self.index)
+
+    def player_array(self, player_id):
+        """Returns a read-only view of one player's shots (only those pages are touched)."""
+        start, stop = self.index[player_id]
+        return self.records[start:stop]
+
+    def player_shots(self, player_id):
+        """Returns one player's shots in the original {"x", "y", "madeShot", "shotPts"} form."""
+        if player_id not in self.index:
+            return []
+        block = self.player_array(player_id)
+        return [
+            {"x": x, "y": y, "madeShot": bool(made), "shotPts": pts}
+            for x, y, made, pts in zip(*(block[field].tolist() for field in ("x", "y", "made", "pts")))
+        ]
+
+    def player_ranges(self):
+        """Returns (player_ids, starts, stops) arrays for vectorized consumers."""
+        ids = list(self.index)
+        bounds = np.array([self.index[player_id] for player_id in ids], dtype=np.int64).reshape(-1, 2)
+        return ids, bounds[:, 0], bounds[:, 1]
+
+
+def season_directory(season, root=SEASONS_DIR):
+    """Partition holding one season's pages and shot store, e.g. shot_seasons/2025."""
+    return os.path.join(root, str(season))
+
+
+def write_seasons_index(root=SEASONS_DIR):
+    """Writes {"seasons": [...], "players": {player_id: [season, ...]}} from the stores under `root`."""
+    seasons = sorted(int(name) for name in os.listdir(root)
+                     if name.isdigit() and os.path.exists(os.path.join(root, name, INDEX_FILE)))
+    players = {}
+    for season in seasons:
+        with open(os.path.join(season_directory(season, root), INDEX_FILE), "r", encoding="utf-8") as f:
+            for player_id in json.load(f):
+                players.setdefault(player_id, []).append(season)
+
+    index = {"seasons": seasons, "players": players}
+    with open(os.path.join(root, SEASONS_INDEX), "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    return index
+
+
+class SeasonStores:
+    """Reads the season partitions one at a time, opening each store on first use."""
+
+    def __init__(self, root=SEASONS_DIR):
+        self.root = root
+        with open(os.path.join(root, SEASONS_INDEX), "r", encoding="utf-8") as f:
+            index = json.load(f)
+        self.seasons = index["seasons"]
+        self.players = index["players"]
+        self.stores = {}
+
+    def store(self, season):
+        if season not in self.stores:
+            self.stores[season] = ShotStore(season_directory(season, self.root))
+        return self.stores[season]
+
+    def player_seasons(self, player_id):
+        return self.players.get(player_id, [])
+
+    def player_history(self, player_id):
+        """Yields (season, shots) for every season the player has shots in, oldest first."""
+        for season in self.player_seasons(player_id):
+            yield season, self.store(season).player_shots(player_id)
@@ -0,0 +1,69 @@
+import gzip
+import json
+import zlib
+
+NDJSON_FILE = "shots.ndjson"
+FLUSH_EVERY = 64  # lines between flushes, so readers can follow a file still being written
+
+
+def open_ndjson(path, mode):
+    """Opens a .ndjson file as text, through gzip when the name ends in .gz."""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class NdjsonWriter:
+    """Writes one {"playerId", "shots"} object per line as players are parsed."""
+
+    def __init__(self, path=NDJSON_FILE, flush_every=FLUSH_EVERY):
+        self.path = path
+        self.flush_every = flush_every
+        self.file = open_ndjson(path, "w")
+        self.count = 0
+
+    def write(self, player):
+        self.file.write(json.dumps(player, separators=(",", ":")) + "\n")
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            self.file.flush()
+
+    def passthrough(self, players):
+        """Writes each player as it goes by and yields it on, e.g. into write_shot_store."""
+        for player in players:
+            self.write(player)
+            yield player
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_ndjson(players, path=NDJSON_FILE):
+    """Streams an iterable of players to `path`; returns how many were written."""
+    with NdjsonWriter(path) as writer:
+        for player in players:
+            writer.write(player)
+        return writer.count
+
+
+def iter_ndjson(path=NDJSON_FILE):
+    """Lazily yields one player dict per line.
+
+    A file still being written may end in a partial line (or, gzipped, a
+    partial block); iteration stops there instead of raising.
+    """
+    with open_ndjson(path, "r") as f:
+        try:
+            for line in f:
+                if not line.endswith("\n"):
+                    return  # partial last line
+                if line.strip():
+                    yield json.loads(line)
+        except (EOFError, zlib.error):
+            return
@@ -0,0 +1,161 @@
+import json
+import numpy as np
+from shot_store import ShotStore
+
+# Basketball-Reference shot charts are 500px wide for a 50ft court (10px per foot),
+# with `top` measured from the baseline. The rim sits 5.25ft in from the baseline.
+PX_PER_FT = 10
+RIM_X = 250
+RIM_Y = 52.5
+
+ZONES = ["restricted_area", "paint", "mid_range", "corner_3", "above_break_3"]
+RESTRICTED_AREA = 4 * PX_PER_FT  # radius from the rim
+LANE_HALF_WIDTH = 8 * PX_PER_FT
+LANE_LENGTH = 19 * PX_PER_FT  # free throw line, from the baseline
+CORNER_DEPTH = 14 * PX_PER_FT  # where the three point line starts to curve
+
+HEX_SIZE = 40  # hexagon radius in px (4ft)
+
+ZONES_FILE = "shot_zones.json"
+
+
+def shots_to_arrays(all_shots):
+    """Flattens [{"playerId", "shots"}, ...] into (player_ids, player index, x, y, made, pts) arrays."""
+    ids = [player["playerId"] for player in all_shots]
+    counts = [len(player["shots"]) for player in all_shots]
+    shots = [shot for player in all_shots for shot in player["shots"]]
+
+    player = np.repeat(np.arange(len(ids)), counts)
+    x = np.fromiter((shot["x"] for shot in shots), dtype=np.float64, count=len(shots))
+    y = np.fromiter((shot["y"] for shot in shots), dtype=np.float64, count=len(shots))
+    made = np.fromiter((shot["madeShot"] for shot in shots), dtype=bool, count=len(shots))
+    pts = np.fromiter((shot["shotPts"] for shot in shots), dtype=np.uint8, count=len(shots))
+    return ids, player, x, y, made, pts
+
+
+def store_to_arrays(store):
+    """Same as shots_to_arrays, straight from a ShotStore without building dicts."""
+    ids, starts, stops = store.player_ranges()
+    lengths = stops - starts
+    player = np.repeat(np.arange(len(ids)), lengths)
+    rows = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+    records = store.records[rows]
+    return (ids, player, records["x"].astype(np.float64), records["y"].astype(np.float64),
+            records["made"].astype(bool), records["pts"])
+
+
+def classify_zones(x, y, pts):
+    """Returns the index into ZONES for every shot."""
+    dx = x - RIM_X
+    dy = y - RIM_Y
+    distance = np.hypot(dx, dy)
+    three = pts == 3
+
+    return np.select(
+        [
+            ~three & (distance < RESTRICTED_AREA),
+            ~three & (np.abs(dx) < LANE_HALF_WIDTH) & (y < LANE_LENGTH),
+            ~three,
+            three & (y < CORNER_DEPTH),
+        ],
+        [0, 1, 2, 3],
+        default=4,
+    )
+
+
+def hex_bins(x, y, size=HEX_SIZE):
+    """Returns axial (q, r) coordinates of the pointy-top hexagon containing each shot."""
+    dx = x - RIM_X
+    dy = y - RIM_Y
+    q = (np.sqrt(3) / 3 * dx - dy / 3) / size
+    r = (2 / 3 * dy) / size
+    s = -q - r
+
+    rq, rr, rs = np.round(q), np.round(r), np.round(s)
+    q_diff, r_diff, s_diff = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+
+    fix_q = (q_diff > r_diff) & (q_diff > s_diff)
+    fix_r = ~fix_q & (r_diff > s_diff)
+    rq = np.where(fix_q, -rr - rs, rq)
+    rr = np.where(fix_r, -rq - rs, rr)
+    return rq.astype(np.int64), rr.astype(np.int64)
+
+
+def percentage(made, attempts):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(attempts > 0, np.round(made / attempts * 100, 1), 0.0)
+
+
+def aggregate(ids, player, x, y, made, pts, hex_size=HEX_SIZE):
+    """Bins every shot in the league at once into zones and hexes, per player and league-wide."""
+    n_players, n_zones = len(ids), len(ZONES)
+    zone = classify_zones(x, y, pts)
+
+    # Zone totals: one bincount over (player, zone) cells
+    cell = player * n_zones + zone
+    zone_fga = np.bincount(cell, minlength=n_players * n_zones).reshape(n_players, n_zones)
+    zone_fgm = np.bincount(cell, weights=made, minlength=n_players * n_zones).reshape(n_players, n_zones).astype(np.int64)
+    league_fga = zone_fga.sum(axis=0)
+    league_fgm = zone_fgm.sum(axis=0)
+
+    # 2PT / 3PT totals
+    three = (pts == 3).astype(np.int64)
+    kind = player * 2 + three
+    kind_fga = np.bincount(kind, minlength=n_players * 2).reshape(n_players, 2)
+    kind_fgm = np.bincount(kind, weights=made, minlength=n_players * 2).reshape(n_players, 2).astype(np.int64)
+
+    # Hex bins: unique (player, q, r) triples
+    q, r = hex_bins(x, y, hex_size)
+    keys = np.stack([player, q, r], axis=1)
+    hex_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    hex_fga = np.bincount(inverse)
+    hex_fgm = np.bincount(inverse, weights=made).astype(np.int64)
+
+    league_hex_keys, league_inverse = np.unique(keys[:, 1:], axis=0, return_inverse=True)
+    league_inverse = league_inverse.ravel()
+    league_hex_fga = np.bincount(league_inverse)
+    league_hex_fgm = np.bincount(league_inverse, weights=made).astype(np.int64)
+
+    zone_pct = percentage(zone_fgm, zone_fga)
+    kind_pct = percentage(kind_fgm, kind_fga)
+    players = {
+        player_id: {
+            "zones": [[int(a), int(m), float(p)] for a, m, p in zip(zone_fga[i], zone_fgm[i], zone_pct[i])],
+            "fg2": [int(kind_fga[i, 0]), int(kind_fgm[i, 0]), float(kind_pct[i, 0])],
+            "fg3": [int(kind_fga[i, 1]), int(kind_fgm[i, 1]), float(kind_pct[i, 1])],
+            "hex": [],
+        }
+        for i, player_id in enumerate(ids)
+    }
+    for (i, hq, hr), a, m in zip(hex_keys.tolist(), hex_fga.tolist(), hex_fgm.tolist()):
+        players[ids[i]]["hex"].append([hq, hr, a, m])
+
+    league_zone_pct = percentage(league_fgm, league_fga)
+    league_hex_pct = percentage(league_hex_fgm, league_hex_fga)
+    return {
+        "zones": ZONES,
+        "hexSize": hex_size,
+        "league": {
+            "zones": [[int(a), int(m), float(p)] for a, m, p in zip(league_fga, league_fgm, league_zone_pct)],
+            "hex": [[hq, hr, int(a), float(p)] for (hq, hr), a, p in zip(league_hex_keys.tolist(), league_hex_fga, league_hex_pct)],
+        },
+        "players": players,
+    }
+
+
+def write_zones(summary, filename=ZONES_FILE):
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(summary, f, separators=(",", ":"))
+
+
+def main(directory=".", filename=ZONES_FILE):
+    """Aggregates the columnar shot store into shot_zones.json."""
+    store = ShotStore(directory)
+    summary = aggregate(*store_to_arrays(store))
+    write_zones(summary, filename)
+    print(f"Wrote zone summary for {len(summary['players'])} players to {filename}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+# Every sink offers:
+#   upsert(table, rows, on_conflict) -> rows as stored (with their id)
+#   delete(table, key, values)       -> removes rows whose key columns match one of `values` (tuples)
+#   target                           -> stable name of the destination; delta sync keeps a manifest per target
+
+
+class SupabaseSink:
+    """Writes to Supabase (PostgREST). Credentials are read when the sink is created, not at import."""
+
+    def __init__(self, client=None):
+        if client is None:
+            from dotenv import load_dotenv
+            from supabase import create_client
+
+            load_dotenv()
+            supabase_url = os.getenv("SUPABASE_URL")
+            supabase_key = os.getenv("SUPABASE_KEY")
+
+            if not supabase_url or not supabase_key:
+                raise ValueError("Missing Supabase credentials. Check .env file.")
+
+            client = create_client(supabase_url, supabase_key)
+        self.client = client
+        self.target = f"supabase-{getattr(client, 'supabase_url', 'default')}"
+
+    def upsert(self, table, rows, on_conflict):
+        result = self.client.table(table).upsert(rows, on_conflict=on_conflict).execute()
+        return result.data or []
+
+    def delete(self, table, key, values):
+        if len(key) == 1:
+            self.client.table(table).delete().in_(key[0], [value[0] for value in values]).execute()
+            return
+
+        for value in values:
+            query = self.client.table(table).delete()
+            for column, v in zip(key, value):
+                query = query.eq(column, v)
+            query.execute()
+
+
+def quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def column_type(values):
+    """SQLite column affinity for a column's Python values."""
+    kinds = {type(value) for value in values if value is not None}
+    if kinds and kinds <= {int, bool}:
+        return "INTEGER"
+    if kinds and kinds <= {int, float}:
+        return "REAL"
+    return "TEXT"
+
+
+class SQLiteSink:
+    """An embedded SQLite database file; tables are created from the first rows written.
+
+    Each table gets an integer id, a unique index on its conflict columns and an
+    index on player_id, so local analytical queries need no network round trips.
+    """
+
+    def __init__(self, path="nba.db"):
+        self.path = path
+        self.target = f"sqlite-{os.path.abspath(path)}"
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+
+    def columns(self, table):
+        return [row["name"] for row in self.connection.execute(f"PRAGMA table_info({quote(table)})")]
+
+    def ensure_table(self, table, rows, key):
+        existing = self.columns(table)
+        names = list(dict.fromkeys(name for row in rows for name in row))
+
+        if not existing:
+            definitions = ["id INTEGER PRIMARY KEY AUTOINCREMENT"] + [
+                f"{quote(name)} {column_type(row.get(name) for row in rows)}" for name in names if name != "id"
+            ]
+            self.connection.execute(f"CREATE TABLE {quote(table)} ({', '.join(definitions)})")
+            existing = ["id"] + [name for name in names if name != "id"]
+        else:
+            for name in names:
+                if name not in existing:
+                    kind = column_type(row.get(name) for row in rows)
+                    self.connection.execute(f"ALTER TABLE {quote(table)} ADD COLUMN {quote(name)} {kind}")
+                    existing.append(name)
+
+        if key != ["id"]:
+            index_name = table + "_" + "_".join(key) + "_key"
+            # A conflict index left from an earlier key would reject rows the current key allows
+            for index in self.connection.execute(f"PRAGMA index_list({quote(table)})").fetchall():
+                if index["name"] != index_name and index["name"].startswith(table + "_") \
+                        and index["name"].endswith("_key"):
+                    self.connection.execute(f"DROP INDEX {quote(index['name'])}")
+            self.connection.execute(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS {quote(index_name)} "
+                f"ON {quote(table)} ({', '.join(quote(column) for column in key)})"
+            )
+        if "player_id" in existing:
+            index_name = quote(table + "_player_id_idx")
+            self.connection.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {quote(table)} (player_id)")
+
+    def upsert(self, table, rows, on_conflict):
+        if not rows:
+            return []
+        key = [on_conflict] if isinstance(on_conflict, str) else list(on_conflict)
+
+        with self.lock, self.connection:
+            self.ensure_table(table, rows, key)
+            data = []
+            for row in rows:
+                names = list(row)
+                sql = (f"INSERT INTO {quote(table)} ({', '.join(quote(name) for name in names)}) "
+                       f"VALUES ({', '.join('?' for _ in names)})")
+                # Rows without their conflict columns (e.g. no id yet) are plain inserts
+                if all(row.get(column) is not None for column in key):
+                    updates = [name for name in names if name not in key]
+                    sql += f" ON CONFLICT ({', '.join(quote(column) for column in key)}) "
+                    sql += (f"DO UPDATE SET {', '.join(f'{quote(n)} = excluded.{quote(n)}' for n in updates)}"
+                            if updates else "DO NOTHING")
+                cursor = self.connection.execute(sql + " RETURNING *", [row[name] for name in names])
+                data.extend(dict(returned) for returned in cursor.fetchall())
+        return data
+
+    def delete(self, table, key, values):
+        if not values or not self.columns(table):
+            return
+        condition = " AND ".join(f"{quote(column)} IS ?" for column in key)  # IS also matches NULL keys
+        with self.lock, self.connection:
+            self.connection.executemany(f"DELETE FROM {quote(table)} WHERE {condition}", [tuple(v) for v in values])
+
+    def query(self, sql, params=()):
+        """Runs a read query against the local database and returns dict rows."""
+        with self.lock:
+            return [dict(row) for row in self.connection.execute(sql, params)]
+
+    def close(self):
+        self.connection.close()
+
+
+class MemorySink:
+    """Keeps tables in process, for tests and for benchmarking the loaders offline."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency  # simulated round trip per request
+        self.target = f"memory-{uuid.uuid4().hex}"  # starts empty, so never shares a manifest
+        self.tables = {}
+        self.lock = threading.Lock()
+        self.last_id = 0
+
+    def upsert(self, table, rows, on_conflict):
+        if self.latency:
+            time.sleep(self.latency)
+        key = [on_conflict] if isinstance(on_conflict, str) else list(on_conflict)
+
+        with self.lock:
+            stored_rows = self.tables.setdefault(table, {})
+            data = []
+            for row in rows:
+                k = tuple(row.get(column) for column in key)
+                if k not in stored_rows or None in k:  # None: no natural key, e.g. a serial id
+                    self.last_id += 1
+                    if None in k:
+                        k = ("__row", self.last_id)
+                    stored_rows[k] = {"id": self.last_id}
+                stored_rows[k] = {**stored_rows[k], **row}
+                data.append(stored_rows[k])
+        return data
+
+    def delete(self, table, key, values):
+        if self.latency:
+            time.sleep(self.latency)
+        targets = {tuple(str(v) for v in value) for value in values}
+
+        with self.lock:
+            stored_rows = self.tables.setdefault(table, {})
+            for k in [k for k, row in stored_rows.items()
+                      if tuple(str(row.get(column)) for column in key) in targets]:
+                del stored_rows[k]
@@ -0,0 +1,84 @@
+import io
+import lxml.etree
+import pandas as pd
+
+
+def as_bytes(content):
+    return content.encode('utf-8') if isinstance(content, str) else content
+
+
+def cell_text(cell):
+    return ''.join(cell.itertext()).strip()
+
+
+def extract_table(content, columns, table_id=None, attributes=None, required=(), max_tables=None,
+                  body_only=True):
+    """Walks Basketball-Reference tables once and returns their rows as one DataFrame.
+
+    `columns` maps a cell's data-stat to the output column for its text, and
+    `attributes` maps an output column to (data-stat, attribute) for values
+    kept in attributes, e.g. {'bball_id': ('player', 'data-append-csv')}.
+    Rows missing any `required` data-stat are skipped; missing cells are None.
+    Only rows under <tbody> are read unless `body_only` is False, and only the
+    first `max_tables` matching tables (all by default).
+
+    Rows are parsed as the document streams in and cleared once read, so
+    each cell is visited once and the frame is built a single time at the end.
+    """
+    attributes = attributes or {}
+    buffers = {column: [] for column in list(columns.values()) + list(attributes)}
+    in_table = 0
+    in_body = 0
+    tables_seen = 0
+
+    events = lxml.etree.iterparse(io.BytesIO(as_bytes(content)), events=('start', 'end'),
+                                  tag=('table', 'tbody', 'tr'), html=True, encoding='utf-8')
+    for event, element in events:
+        tag = element.tag
+        if tag == 'table':
+            if event == 'start':
+                if in_table or table_id is None or element.get('id') == table_id:
+                    in_table += 1
+            elif in_table:
+                in_table -= 1
+                if not in_table:
+                    tables_seen += 1
+                    if max_tables is not None and tables_seen >= max_tables:
+                        break
+            continue
+
+        if tag == 'tbody':
+            in_body += 1 if event == 'start' else -1
+            continue
+
+        if event == 'start' or not in_table or (body_only and not in_body):
+            continue
+
+        cells = {}
+        for cell in element:
+            stat = cell.get('data-stat')
+            if stat is not None and stat not in cells:
+                cells[stat] = cell
+
+        if all(stat in cells for stat in required):
+            for stat, column in columns.items():
+                cell = cells.get(stat)
+                buffers[column].append(cell_text(cell) if cell is not None else None)
+            for column, (stat, attribute) in attributes.items():
+                cell = cells.get(stat)
+                buffers[column].append(cell.get(attribute) if cell is not None else None)
+
+        # Free rows already read
+        element.clear()
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+
+    return pd.DataFrame(buffers)
+
+
+def first_text(content, tag):
+    """Text of the first <tag> element, without parsing the rest of the page."""
+    for _, element in lxml.etree.iterparse(io.BytesIO(as_bytes(content)), events=('end',), tag=tag,
+                                           html=True, encoding='utf-8'):
+        return cell_text(element)
+    return None
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The data scripts import each other as top-level modules (python db.py, python cli.py ...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
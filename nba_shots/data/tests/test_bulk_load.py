@@ -0,0 +1,60 @@
+import pytest
+import bulk_load
+from bulk_load import BulkLoadError, bulk_upsert
+from delta_sync import load_manifest, sync_table
+from sinks import MemorySink
+
+
+class FailingSink(MemorySink):
+    """Rejects every upsert containing `bad_id`, like a server refusing one chunk."""
+
+    def __init__(self, bad_id):
+        super().__init__()
+        self.bad_id = bad_id
+        self.attempts = 0
+
+    def upsert(self, table, rows, on_conflict):
+        if any(row["player_id"] == self.bad_id for row in rows):
+            self.attempts += 1
+            raise ConnectionError("chunk rejected")
+        return super().upsert(table, rows, on_conflict)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(bulk_load.time, "sleep", lambda seconds: None)
+
+
+def rows(count):
+    return [{"player_id": f"p{i:03}", "pts": i} for i in range(count)]
+
+
+def test_bulk_upsert_returns_rows_and_report():
+    data, report = bulk_upsert(MemorySink(), "player", rows(25), ["player_id"], chunk_size=10)
+    assert [row["player_id"] for row in data] == [row["player_id"] for row in rows(25)]
+    assert (report.rows, report.chunks, report.failed_chunks) == (25, 3, 0)
+
+
+def test_bulk_upsert_raises_when_a_chunk_fails():
+    sink = FailingSink("p015")
+    with pytest.raises(BulkLoadError) as error:
+        bulk_upsert(sink, "player", rows(25), ["player_id"], chunk_size=10)
+
+    report = error.value.report
+    assert (report.rows, report.chunks, report.failed_chunks) == (15, 2, 1)
+    assert report.retries == bulk_load.RETRIES - 1
+    assert sink.attempts == bulk_load.RETRIES
+    # The other chunks were still written
+    assert len(sink.tables["player"]) == 15
+
+
+def test_failed_sync_keeps_the_manifest(tmp_path):
+    directory = str(tmp_path)
+    sink = FailingSink("p015")
+    with pytest.raises(BulkLoadError):
+        sync_table(sink, "player", rows(25), ["player_id"], chunk_size=10, directory=directory)
+    assert load_manifest("player", sink.target, directory) == {}
+
+    sink.bad_id = None
+    sync_table(sink, "player", rows(25), ["player_id"], chunk_size=10, directory=directory)
+    assert len(load_manifest("player", sink.target, directory)) == 25
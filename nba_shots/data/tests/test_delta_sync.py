@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+from db import load_awards_data
+from delta_sync import diff_records, row_keys, sync_table
+from sinks import SQLiteSink
+
+KEY = ["player_id", "season", "award"]
+
+
+def test_diff_records_raises_on_duplicate_key():
+    records = [
+        {"player_id": "jamesle01", "season": None, "award": "NBA Champion"},
+        {"player_id": "jamesle01", "season": None, "award": "NBA Champion"},
+    ]
+    with pytest.raises(ValueError, match="repeat a natural key"):
+        diff_records(records, KEY, {})
+
+
+def test_diff_records_splits_against_manifest():
+    old = [{"player_id": "a", "season": "2001-02", "award": "MVP", "team": "LAL"},
+           {"player_id": "b", "season": "2001-02", "award": "ROY", "team": "BOS"},
+           {"player_id": "c", "season": "2002-03", "award": "DPOY", "team": None}]
+    _, _, _, manifest = diff_records(old, KEY, {})
+
+    new = [old[0], dict(old[1], team="NYK"), {"player_id": "d", "season": "2003-04", "award": "MIP", "team": None}]
+    inserted, changed, deleted, current = diff_records(new, KEY, manifest)
+    assert inserted == [new[2]]
+    assert changed == [new[1]]
+    assert deleted == row_keys([old[2]], KEY)
+    assert len(current) == 3
+
+
+def test_delta_awards_keep_repeated_championships(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    pd.DataFrame({
+        "Season": ["2011-12", None, None, None],
+        "Player": ["LeBron James"] * 4,
+        "Award": ["MVP", "NBA Champion", "NBA Champion", "NBA Champion"],
+        "bball_id": ["jamesle01"] * 4,
+    }).to_csv("awards.csv", index=False)
+    sink = SQLiteSink(str(tmp_path / "nba.db"))
+
+    load_awards_data("awards.csv", sink=sink, delta=True)
+    assert sink.query("SELECT COUNT(*) AS n FROM awards WHERE award = 'NBA Champion'") == [{"n": 3}]
+
+    # A repeat run sends nothing and keeps every row
+    load_awards_data("awards.csv", sink=sink, delta=True)
+    assert sink.query("SELECT COUNT(*) AS n FROM awards") == [{"n": 4}]
+
+
+def test_manifest_from_a_shorter_key_is_replaced(tmp_path):
+    sink = SQLiteSink(str(tmp_path / "nba.db"))
+    directory = str(tmp_path / "manifests")
+    row = {"player_id": "jamesle01", "season": None, "award": "NBA Champion"}
+    sync_table(sink, "awards", [row], KEY, directory=directory)
+
+    rows = [dict(row, occurrence=0), dict(row, occurrence=1)]
+    sync_table(sink, "awards", rows, KEY + ["occurrence"], directory=directory)
+    assert sink.query("SELECT occurrence FROM awards ORDER BY occurrence") == [{"occurrence": 0}, {"occurrence": 1}]
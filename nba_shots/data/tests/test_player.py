@@ -0,0 +1,18 @@
+import random
+import time
+from string import ascii_lowercase
+import player
+
+
+def test_bios_are_written_in_letter_order(tmp_path, monkeypatch):
+    def scrape_bio_letter(ch, session=None, rate_limiter=None):
+        time.sleep(random.uniform(0, 0.02))  # letters finish out of order
+        return [{column: None for column in player.BIO_COLUMNS} | {'Player': f'{ch} {i}', 'bball_id': f'{ch}{i}'}
+                for i in range(3)]
+
+    monkeypatch.setattr(player, 'scrape_bio_letter', scrape_bio_letter)
+    filename = str(tmp_path / 'bios.csv')
+    df = player.scrape_player_bio(workers=8, filename=filename)
+
+    assert df['bball_id'].tolist() == [f'{ch}{i}' for ch in ascii_lowercase for i in range(3)]
+    assert df.index.tolist() == list(range(len(ascii_lowercase) * 3))
@@ -0,0 +1,45 @@
+import os
+import pickle
+import pandas as pd
+from player_registry import PlayerRegistry, load_registry, registry_cache
+from player_resolver import load_resolver
+
+ROWS = pd.DataFrame({
+    "Player": ["Johnny Davis", "Johnny Davis", "Johnny Davis", "Johnny Davis", "LeBron James"],
+    "From": [1977, 1977, 2023, 2023, 2004],
+    "To": [1986, 1986, 2025, 2025, 2025],
+    "player_id": ["davisjo01", "davisjo01", "davisjo06", "davisjo06", "jamesle01"],
+    "Team": ["Unknown", "Washington Wizards", "Unknown", "Washington Wizards", "Los Angeles Lakers"],
+})
+
+
+def test_repeated_ids_keep_their_last_row(tmp_path):
+    ROWS.to_csv(tmp_path / "players.csv", index=False)
+    registry = PlayerRegistry.from_csv(str(tmp_path / "players.csv"))
+
+    assert registry.ids == ["davisjo01", "davisjo06", "jamesle01"]
+    assert registry.row("davisjo01")["Team"] == "Washington Wizards"
+    assert registry.active_in(2025) == ["davisjo06", "jamesle01"]
+    assert registry.frame()["Team"].tolist() == ["Washington Wizards", "Washington Wizards", "Los Angeles Lakers"]
+
+
+def test_resolver_comes_from_the_registry(tmp_path):
+    ROWS.to_csv(tmp_path / "players.csv", index=False)
+    resolver = load_resolver(str(tmp_path / "players.csv"))
+
+    assert resolver.ids == ["davisjo01", "davisjo06", "jamesle01"]
+    assert resolver.resolve("Johnny Davis", "1980-81") == "davisjo01"
+    assert resolver.resolve("Johnny Davis") == "davisjo06"
+
+
+def test_cache_from_an_older_version_is_rebuilt(tmp_path):
+    csv = str(tmp_path / "players.csv")
+    ROWS.to_csv(csv, index=False)
+    stale = load_registry(csv)
+    stale.version = 1
+    stale.ids = ["davisjo01", "davisjo01"]
+    with open(registry_cache(csv), "wb") as f:
+        pickle.dump(stale, f)
+    os.utime(registry_cache(csv), (os.path.getmtime(csv) + 10,) * 2)
+
+    assert load_registry(csv).ids == ["davisjo01", "davisjo06", "jamesle01"]
@@ -0,0 +1,85 @@
+import asyncio
+import gzip
+import json
+import pandas as pd
+import pytest
+from query_service import HttpProtocol, PlayerData, QueryService
+from shot_store import write_shot_store
+
+SHOTS = [{"x": i, "y": i + 1, "madeShot": i % 2 == 0, "shotPts": 2} for i in range(200)]
+
+
+@pytest.fixture
+def service(tmp_path):
+    pd.DataFrame({
+        "Player": ["LeBron James", "Stephen Curry"],
+        "From": [2004, 2010],
+        "To": [2025, 2025],
+        "Position": ["F", "G"],
+        "Height": ["6-9", "6-2"],
+        "Weight": [250, 185],
+        "Birth Date": ["December 30, 1984", "March 14, 1988"],
+        "College": [None, "Davidson"],
+        "player_id": ["jamesle01", "curryst01"],
+        "draft_year": [2003, 2009],
+        "draft_round": [1, 1],
+        "draft_number": [1, 7],
+        "Team": ["Los Angeles Lakers", "Golden State Warriors"],
+    }).to_csv(tmp_path / "updated_players.csv", index=False)
+    write_shot_store([{"playerId": "jamesle01", "shots": SHOTS}], str(tmp_path))
+    return QueryService(PlayerData(str(tmp_path)))
+
+
+def test_player_detail_is_prerendered(service):
+    response = service.get("/player/jamesle01")
+    assert response is service.details["jamesle01"]
+    detail = json.loads(response.body)
+    assert detail["player"]["team"] == "Los Angeles Lakers"
+    assert detail["shot_data"] == SHOTS
+    assert gzip.decompress(response.gzipped) == response.body
+
+
+def test_players_filter_and_pages(service):
+    response = service.get("/players?team=warriors&page=1&page_size=1")
+    assert [p["player_id"] for p in json.loads(response.body)] == ["curryst01"]
+    assert response.headers["X-Total-Count"] == "1"
+    assert service.get("/players?page=0").status == 400
+    assert service.get("/player/nobody").status == 404
+
+
+async def exchange(service, raw):
+    """Sends raw request bytes to a served HttpProtocol and returns everything it sends back."""
+    loop = asyncio.get_running_loop()
+    server = await loop.create_server(lambda: HttpProtocol(service), "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(raw)
+        data = await reader.read()  # until the server closes the connection
+        writer.close()
+    return data
+
+
+def test_http_keep_alive_etag_and_gzip(service):
+    etag = service.get("/player/jamesle01").etag
+    data = asyncio.run(exchange(service, (
+        "GET /player/jamesle01 HTTP/1.1\r\nHost: x\r\nAccept-Encoding: gzip\r\n\r\n"
+        f"GET /player/jamesle01 HTTP/1.1\r\nHost: x\r\nIf-None-Match: {etag}\r\n\r\n"
+        "GET /nope HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n"
+    ).encode()))
+
+    heads = []
+    while data:  # split the stream on each response's Content-Length
+        head, _, data = data.partition(b"\r\n\r\n")
+        heads.append(head)
+        length = int(next(line for line in head.split(b"\r\n") if line.startswith(b"Content-Length:")).split()[1])
+        data = data[length:]
+    assert [head.split(b"\r\n")[0] for head in heads] == [
+        b"HTTP/1.1 200 OK", b"HTTP/1.1 304 Not Modified", b"HTTP/1.1 404 Not Found"]
+    assert b"Content-Encoding: gzip" in heads[0]
+    assert b"Connection: close" in heads[2]
+
+
+def test_http_refuses_other_methods(service):
+    data = asyncio.run(exchange(service, b"POST /players HTTP/1.1\r\nHost: x\r\nContent-Length: 2\r\n\r\n{}"))
+    assert data.startswith(b"HTTP/1.1 501 Not Implemented\r\n")
@@ -0,0 +1,38 @@
+import os
+import pytest
+from shot_parser import parse_shots_html, parse_shots_soup
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bench_fixtures", "shots.html")
+
+MADE = '<div class="tooltip make" style="left: 10px; top: 20px;" tip="Made 3-pointer<br>27 ft">&#9679;</div>'
+MISSED = '<div class="tooltip miss" style="left: 30px; top: 40px;" tip="Missed 2-pointer<br>5 ft">&#215;</div>'
+
+PAGES = {
+    "double quotes": f'<div class="shot-area">{MADE}{MISSED}</div>',
+    "single quotes": "<div class='shot-area'><div class='tooltip make' style='left:1px;top:2px' tip='3-pointer'></div></div>",
+    "unquoted": "<div class=shot-area><div class=tooltip style=left:5px;top:6px tip=jumper></div></div>",
+    "comment with a div": f'<div class="shot-area"><!-- <div class="x"> -->{MADE}</div>',
+    "comment closing a div": f'<div class="shot-area"><!-- </div> -->{MISSED}</div>',
+    "nested divs": f'<div class="shot-area"><div style="left:7px;top:8px"><div style="left:9px;top:9px"></div></div></div>',
+    "several classes": f'<section><div class="chart shot-area wide">{MADE}</div></section>',
+    "no shot area": f'<div class="shot-area-legend">{MADE}</div>',
+    "missing position": '<div class="shot-area"><div class="tooltip make" style="top: 4px"></div></div>',
+    "empty": "",
+}
+
+
+@pytest.mark.parametrize("name", PAGES)
+def test_matches_the_soup_parser(name):
+    assert parse_shots_html(PAGES[name]) == parse_shots_soup(PAGES[name])
+
+
+def test_comment_does_not_hide_shots():
+    assert parse_shots_html(PAGES["comment with a div"]) == [{"x": 10, "y": 20, "madeShot": True, "shotPts": 3}]
+
+
+def test_fixture_matches_the_soup_parser():
+    with open(FIXTURE, "r", encoding="utf-8") as f:
+        html = f.read()
+    shots = parse_shots_html(html)
+    assert len(shots) == 1200
+    assert shots == parse_shots_soup(html)
@@ -0,0 +1,46 @@
+import os
+import numpy as np
+import pytest
+from shot_store import SHOT_DTYPE, SHOTS_FILE, ShotStore, ShotStoreWriter, update_shot_store, write_shot_store
+
+
+def player(player_id, count, offset=0):
+    shots = [{"x": i + offset, "y": 2 * i, "madeShot": i % 2 == 0, "shotPts": 3 if i % 3 == 0 else 2}
+             for i in range(count)]
+    return {"playerId": player_id, "shots": shots}
+
+
+def test_streamed_write_round_trips(tmp_path):
+    players = [player("a", 5), player("b", 0), player("c", 3)]
+    write_shot_store(iter(players), str(tmp_path))
+
+    store = ShotStore(str(tmp_path))
+    assert store.player_ids() == ["a", "b", "c"]
+    for p in players:
+        assert store.player_shots(p["playerId"]) == p["shots"]
+    # A plain .npy, loadable without the store
+    assert np.load(os.path.join(tmp_path, SHOTS_FILE)).shape == (8,)
+    assert sorted(os.listdir(tmp_path)) == ["shots.npy", "shots_index.json"]
+
+
+def test_update_replaces_only_the_given_players(tmp_path):
+    write_shot_store([player("a", 4), player("b", 2), player("c", 1)], str(tmp_path))
+    update_shot_store([player("b", 6, offset=100), player("d", 1)], ["b", "c", "d"], str(tmp_path))
+
+    store = ShotStore(str(tmp_path))
+    assert store.player_ids() == ["a", "b", "d"]
+    assert store.player_shots("a") == player("a", 4)["shots"]
+    assert store.player_shots("b") == player("b", 6, offset=100)["shots"]
+    assert "c" not in store
+
+
+def test_failed_write_keeps_the_old_store(tmp_path):
+    write_shot_store([player("a", 4)], str(tmp_path))
+    with pytest.raises(RuntimeError):
+        with ShotStoreWriter(str(tmp_path)) as writer:
+            writer.add("z", np.zeros(3, dtype=SHOT_DTYPE))
+            raise RuntimeError("parse failed")
+
+    store = ShotStore(str(tmp_path))
+    assert store.player_ids() == ["a"]
+    assert sorted(os.listdir(tmp_path)) == ["shots.npy", "shots_index.json"]
@@ -4,6 +4,7 @@ import { PlayerCard } from './PlayerCard'
 import { ShotChart } from './ShotChart'
 import {PlayerPercentiles} from './PlayerPercentiles'
 import rapport_ranking from '../rapport_ranking'
+import leaguePercentileTable from '../percentiles.json'
     
 export const Dashboard = () => {
     const { playerId } = useParams();
@@ -44,11 +45,19 @@ export const Dashboard = () => {
   
     // Get the player ranking from the rapport_ranking
     let playerRapport = rapport_ranking.find(player => player['Player'] === currentPlayer);
+
+    // League percentiles: the API's when it sends them, else the table built by percentiles.py
+    const percentileRow = leaguePercentileTable.players[playerId];
+    const leaguePercentiles = (playerData && playerData.percentiles && Object.keys(playerData.percentiles).length)
+      ? playerData.percentiles
+      : percentileRow
+        ? Object.fromEntries(leaguePercentileTable.columns.map((column, i) => [column, percentileRow[i]]))
+        : undefined;
   
     return (
       <div className="flex flex-row">
         <PlayerCard playerId={playerId} playerData={playerData} />
-        <PlayerPercentiles playerRapportRanking={playerRapport} />
+        <PlayerPercentiles playerRapportRanking={playerRapport} leaguePercentiles={leaguePercentiles} />
         
         <ShotChart
           playerId={playerId}
@@ -1,6 +1,6 @@
 import React from 'react';
 
-export const PlayerPercentiles = ({ playerRapportRanking }) => {
+export const PlayerPercentiles = ({ playerRapportRanking, leaguePercentiles }) => {
   const player = playerRapportRanking || {
     name: "No Data Available",
     Off: 0,
@@ -23,21 +23,27 @@ export const PlayerPercentiles = ({ playerRapportRanking }) => {
     return isNaN(result) ? 0 : result;
   };
 
+  // League percentiles from nba_shots/data/percentiles.py win over the rough estimates
+  const rank = (column, adjustment, multiplier) =>
+    leaguePercentiles && leaguePercentiles[column] != null
+      ? safeNumber(leaguePercentiles[column])
+      : calculatePercentile(player[column], adjustment, multiplier);
+
   const percentiles = [
     { 
       key: 'Offense', 
       label: 'Offense', 
-      value: calculatePercentile(player.Off, 6, 10)
+      value: rank('Off', 6, 10)
     }, 
     { 
       key: 'Defense', 
       label: 'Defense', 
-      value: calculatePercentile(player.Def, 3, 15)
+      value: rank('Def', 3, 15)
     }, 
     { 
       key: 'Overall', 
       label: 'Overall', 
-      value: calculatePercentile(player.Tot, 7, 8)
+      value: rank('Tot', 7, 8)
     },  
     // { key: 'WAR', label: 'WAR', value: Math.round((player.WAR / 3.5) * 100) },     
     // { key: 'WAR82', label: 'WAR/82', value: Math.round((player.WAR82 / 17) * 100)} 